@@ -1,6 +1,15 @@
-from .break_manager import BreakManager
+from .break_manager import BreakManager, ReminderProgram
 from .notifier import notify_start_break, notify_end_break, notify_too_close, demo_notifications
-from .iris_tracker import IrisGazeTracker
+from .iris_tracker import IrisGazeTracker, load_tuning
 from .ui_overlay import UIOverlay
 from .session_tracker import SessionTracker
-from .system_tray import SystemTray, TRAY_AVAILABLE
\ No newline at end of file
+from .system_tray import SystemTray, TRAY_AVAILABLE
+from .capture_manager import CaptureManager, CameraStream
+from .presence_detector import PresenceDetector, MotionDetector
+from .metrics_server import MetricsServer, LoopMetrics
+from .duty_cycle import DutyCycleMonitor
+from .heatmap_renderer import HeatmapRenderer
+from .landmark_backends import create_backend, FaceMeshBackend, FaceLandmarkerBackend
+from .gaze_calibration import GazeCalibration, CalibrationRoutine, GazeHeatmap
+from .single_instance import SingleInstance, FileLock
+from .threshold_sweep import SequenceRecorder
@@ -0,0 +1,312 @@
+"""
+Batch Analyzer - Run LookAlive's gaze, break and session logic over recorded videos
+
+usage: python -m core.batch_analyzer VIDEOS... -o reports [-j WORKERS] [--stride N]
+                                      [--tuning FILE] [--save-landmarks]
+
+Each file is analysed in a worker process with a fresh FaceMesh, against the
+video's own timestamps, while a reader thread decodes ahead of it. Per-file
+summaries are written as they finish, so an interrupted run picks up where it
+left off; a merged report is written at the end.
+"""
+import argparse
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from .break_manager import BreakManager
+from .iris_tracker import IrisGazeTracker, load_tuning
+from .landmark_backends import FaceMeshBackend
+from .session_tracker import SessionTracker, write_json_atomic
+from .threshold_sweep import SequenceRecorder
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+class VideoClock:
+    """Clock that reads the current video timestamp instead of the wall clock."""
+
+    def __init__(self, start):
+        self.start = start
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+class FrameReader:
+    """
+    Decodes a video on a background thread into a bounded queue of RGB frames,
+    so decoding runs ahead while FaceMesh works on the current frame.
+    Every `stride`-th frame is decoded, the rest are only grabbed.
+    Iterating yields (frame index, rgb frame) until the video ends.
+    """
+
+    END = object()
+
+    def __init__(self, cap, stride=1, max_queued=8):
+        self.cap = cap
+        self.stride = stride
+        self.frames = queue.Queue(maxsize=max_queued)
+        self.count = 0  # frames read, including the ones only grabbed
+        self.error = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        index = 0
+        try:
+            while not self.stopped.is_set():
+                if index % self.stride:
+                    if not self.cap.grab():
+                        break
+                    index += 1
+                    continue
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self._put((index, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+                index += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            self.count = index
+            self._put(self.END)
+
+    def _put(self, item):
+        # block while the queue is full, but give up once the consumer has stopped
+        while not self.stopped.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self):
+        while True:
+            item = self.frames.get()
+            if item is self.END:
+                if self.error:
+                    raise self.error
+                return
+            yield item
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+
+def _init_worker():
+    # one process per core - keep OpenCV from spawning its own thread pool in each
+    cv2.setNumThreads(1)
+
+
+def find_videos(paths):
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                videos.extend(os.path.join(root, f) for f in sorted(files)
+                              if f.lower().endswith(VIDEO_EXTENSIONS))
+        elif os.path.isfile(path):
+            videos.append(path)
+    return videos
+
+
+def summary_path(video, out_dir):
+    # path hash keeps same-named files from different folders apart
+    digest = hashlib.sha1(os.path.abspath(video).encode("utf-8")).hexdigest()[:8]
+    stem = os.path.splitext(os.path.basename(video))[0]
+    return os.path.join(out_dir, f"{stem}-{digest}.summary.json")
+
+
+def _source_stamp(video):
+    stat = os.stat(video)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def is_done(video, out_dir) -> bool:
+    """True if a summary exists for this exact version of the file."""
+    path = summary_path(video, out_dir)
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get("source") == _source_stamp(video)
+    except:
+        return False
+
+
+def analyse_video(video, out_dir, stride=1, screen_limit=20 * 60, break_duration=20, queue_frames=8,
+                  tuning=None, save_landmarks=False):
+    """
+    Replay one recording through the tracker, break scheduler and session tracker.
+    A FrameReader decodes every `stride`-th frame up to `queue_frames` ahead.
+    Each video gets its own FaceMesh, so tracking state never carries over
+    from the previous file. With save_landmarks the analysed frames are also
+    kept as a landmark sequence for core.threshold_sweep.
+    """
+    cap = cv2.VideoCapture(video)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video {video}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    duration = total_frames / fps if total_frames > 0 else 0
+    # recordings usually end at their modification time
+    clock = VideoClock(os.path.getmtime(video) - duration)
+
+    session_file = summary_path(video, out_dir).replace(".summary.json", ".session.json")
+    if os.path.exists(session_file):
+        os.remove(session_file)  # partial data from an interrupted run
+
+    tracker = IrisGazeTracker(clock=clock, tuning=tuning)
+    recorder = SequenceRecorder() if save_landmarks else None
+    break_manager = BreakManager(screen_limit, break_duration)
+    session = SessionTracker(data_file=session_file, start_time=clock.start)
+
+    counts = {"frames": 0, "analysed": 0, "face": 0, "looking": 0, "too_close": 0, "breaks": 0}
+    gaze_counts = {}
+    started = time.perf_counter()
+
+    backend = FaceMeshBackend()
+    reader = FrameReader(cap, stride, queue_frames).start()
+    try:
+        for index, rgb in reader:
+            clock.now = clock.start + index / fps
+            counts["analysed"] += 1
+
+            backend.submit(rgb, int((index + 1) * 1000 / fps))
+            result = backend.poll()
+            landmarks = result.landmarks if result is not None else None
+            if landmarks:
+                analysis = tracker.get_gaze_analysis(landmarks, rgb.shape)
+                gaze = analysis.gaze_direction
+                counts["face"] += 1
+                counts["too_close"] += bool(analysis.too_close)
+            else:
+                gaze = "away"
+            if recorder:
+                recorder.add(clock.now, landmarks, rgb.shape, tracker.geometry.yaw, tracker.geometry.pitch)
+
+            looking = gaze == "center"
+            counts["looking"] += looking
+            gaze_counts[gaze] = gaze_counts.get(gaze, 0) + 1
+            session.update(looking, clock.now)
+            event, _ = break_manager.update_state(gaze, clock.now)
+            if event == "start_break":
+                counts["breaks"] += 1
+    finally:
+        reader.stop()
+        cap.release()
+        backend.close()
+    index = counts["frames"] = reader.count
+    session.close()
+    if recorder:
+        recorder.save(summary_path(video, out_dir).replace(".summary.json", ".landmarks.npz"))
+
+    seconds_per_sample = stride / fps
+    summary = {
+        "file": os.path.abspath(video),
+        "source": _source_stamp(video),
+        "duration_s": round(index / fps, 2),
+        "fps": fps,
+        "stride": stride,
+        "frames": counts["frames"],
+        "analysed_frames": counts["analysed"],
+        "face_frames": counts["face"],
+        "screen_time_min": round(counts["looking"] * seconds_per_sample / 60, 2),
+        "face_time_min": round(counts["face"] * seconds_per_sample / 60, 2),
+        "too_close_fraction": round(counts["too_close"] / counts["face"], 4) if counts["face"] else 0,
+        "gaze_frames": gaze_counts,
+        "breaks_triggered": counts["breaks"],
+        "blinks": tracker.blink_counter,
+        "blink_rate": round(tracker.get_blink_rate(), 2),
+        "hourly_minutes": session.all_data.get("daily", {}),
+        "processing_s": round(time.perf_counter() - started, 2),
+    }
+    write_json_atomic(summary_path(video, out_dir), summary)
+    return summary
+
+
+def merge_report(videos, out_dir):
+    """combine every available per-file summary into report.json"""
+    files = []
+    for video in videos:
+        path = summary_path(video, out_dir)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                files.append(json.load(f))
+
+    totals = {"files": len(files), "duration_s": 0, "screen_time_min": 0, "face_time_min": 0,
+              "breaks_triggered": 0, "blinks": 0}
+    for summary in files:
+        for key in totals:
+            if key != "files":
+                totals[key] += summary[key]
+    totals["duration_s"] = round(totals["duration_s"], 2)
+    totals["screen_time_min"] = round(totals["screen_time_min"], 2)
+    totals["face_time_min"] = round(totals["face_time_min"], 2)
+
+    report = {"totals": totals, "missing": len(videos) - len(files), "files": files}
+    write_json_atomic(os.path.join(out_dir, "report.json"), report)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse recorded webcam sessions with LookAlive")
+    parser.add_argument("inputs", nargs="+", help="video files or folders")
+    parser.add_argument("-o", "--out", default="batch_reports", help="output folder")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--stride", type=int, default=1, help="analyse every Nth frame")
+    parser.add_argument("--screen-limit", type=float, default=20 * 60, help="seconds before a break")
+    parser.add_argument("--break-duration", type=float, default=20, help="break length in seconds")
+    parser.add_argument("--tuning", help="tuned thresholds from core.threshold_sweep")
+    parser.add_argument("--save-landmarks", action="store_true",
+                        help="also write landmark sequences for core.threshold_sweep")
+    parser.add_argument("--force", action="store_true", help="re-analyse files that already have summaries")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out, exist_ok=True)
+    videos = find_videos(args.inputs)
+    pending = [v for v in videos if args.force or not is_done(v, args.out)]
+    print(f"{len(videos)} videos, {len(videos) - len(pending)} already done, {len(pending)} to analyse")
+
+    tuning = load_tuning(args.tuning)
+    failed = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers), initializer=_init_worker) as pool:
+            futures = {
+                pool.submit(analyse_video, v, args.out, max(1, args.stride),
+                            args.screen_limit, args.break_duration,
+                            tuning=tuning, save_landmarks=args.save_landmarks): v
+                for v in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                video = futures[future]
+                try:
+                    summary = future.result()
+                    print(f"[{done}/{len(pending)}] {video}: {summary['screen_time_min']:.1f} min on screen "
+                          f"({summary['processing_s']:.0f}s)")
+                except Exception as e:
+                    failed += 1
+                    print(f"[{done}/{len(pending)}] {video}: failed - {e}")
+
+    report = merge_report(videos, args.out)
+    totals = report["totals"]
+    print(f"Report: {os.path.join(args.out, 'report.json')} - {totals['files']} files, "
+          f"{totals['screen_time_min']:.0f} min screen time, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
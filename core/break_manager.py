@@ -1,37 +1,202 @@
+import heapq
 import time
 
 
+class ReminderProgram:
+    """
+    One break rule: after `interval` seconds of screen time, take a break of
+    `duration` seconds. Looking away for less than `grace` seconds doesn't
+    reset the count; looking away longer counts as having rested.
+    """
+
+    def __init__(self, name, interval, duration, grace=0, title=None, message=None):
+        self.name = name
+        self.interval = interval
+        self.duration = duration
+        self.grace = grace
+        self.title = title or name
+        self.message = message or f"Time for a {duration}s break"
+
+        # scheduler state
+        self.watch_start = None
+        self.due = False
+        self.generation = 0
+
+    def clear(self):
+        self.watch_start = None
+        self.due = False
+        self.generation += 1
+
+
 class BreakManager:
-    def __init__(self, screen_limit, break_duration):
+    """
+    Deadline-based break scheduler.
+    Pending deadlines live in a heap; a frame only pays for a gaze comparison
+    and a peek at the earliest deadline, so cost doesn't depend on frame rate.
+    """
+
+    def __init__(self, screen_limit, break_duration, programs=None):
         self.screen_limit = screen_limit
         self.break_duration = break_duration
-        self.start_screen_watch_time = None
+        self.programs = programs or [
+            ReminderProgram("20-20-20", screen_limit, break_duration, grace=break_duration,
+                            title="20-20-20 Rule", message="Look 20 feet away for 20 seconds!"),
+        ]
+
         self.break_in_progress = False
         self.break_start_time = None
+        self.break_end_time = None
+        self.break_program = None
 
-    def update_state(self, gaze):
-        now = time.time()
-        notify = None
+        self.looking = False
+        self.away_since = None
+        self.away_generation = 0
+        self.deferred = []  # programs that came due during another break
+
+        self.heap = []
+        self.seq = 0
+
+    @property
+    def start_screen_watch_time(self):
+        return self.programs[0].watch_start
+
+    def _push(self, deadline, kind, program=None, generation=0):
+        self.seq += 1
+        heapq.heappush(self.heap, (deadline, self.seq, kind, program, generation))
+        # drop stale entries if rapid gaze flicker has piled them up
+        if len(self.heap) > 64:
+            self.heap = [e for e in self.heap if not self._stale(e)]
+            heapq.heapify(self.heap)
+
+    def _stale(self, entry):
+        _, _, kind, program, generation = entry
+        if kind == "grace":
+            return generation != self.away_generation
+        if kind == "due":
+            return generation != program.generation
+        return False
+
+    def _start_watches(self, now):
+        for program in self.programs:
+            if program.watch_start is None:
+                program.watch_start = now
+                self._push(now + program.interval, "due", program, program.generation)
+            elif program.due:
+                # came due during a brief look-away
+                program.due = False
+                self.deferred.append(program)
 
-        if gaze == "center" and not self.break_in_progress:
-            if self.start_screen_watch_time is None:
-                self.start_screen_watch_time = now
-            elif now - self.start_screen_watch_time >= self.screen_limit:
-                self.break_in_progress = True
-                self.break_start_time = now
-                notify = "start_break"
+    def _schedule_grace_check(self, now):
+        pending = [p.grace for p in self.programs
+                   if p.watch_start is not None and self.away_since + p.grace > now]
+        if pending:
+            self._push(self.away_since + min(pending), "grace", generation=self.away_generation)
+
+    def _on_gaze_change(self, looking, now):
+        self.looking = looking
+        self.away_generation += 1
+        if looking:
+            self.away_since = None
+            if not self.break_in_progress:
+                self._start_watches(now)
         else:
-            self.start_screen_watch_time = None
+            self.away_since = now
+            # no grace: any look-away counts as rest
+            self._rest(lambda p: p.grace <= 0)
+            self._schedule_grace_check(now)
+
+    def _rest(self, rested):
+        """clear every running program `rested` accepts; cleared ones no longer wait in deferred"""
+        for p in self.programs:
+            if p.watch_start is not None and rested(p):
+                p.clear()
+        self.deferred = [p for p in self.deferred if p.watch_start is not None]
+
+    def _start_break(self, program, now):
+        self.break_in_progress = True
+        self.break_start_time = now
+        self.break_end_time = now + program.duration
+        self.break_program = program
+        program.clear()
+        self._push(self.break_end_time, "break_end")
+        return "start_break"
 
-        if (
-            self.break_in_progress
-            and now - self.break_start_time >= self.break_duration
-        ):
+    def _fire(self, kind, program, now):
+        if kind == "due":
+            if self.break_in_progress or not self.looking:
+                # wait for the current break to end / the user to come back
+                if self.break_in_progress:
+                    self.deferred.append(program)
+                else:
+                    program.due = True
+                return None
+            return self._start_break(program, now)
+
+        if kind == "grace":
+            # away long enough: every program whose grace has run out is rested
+            self._rest(lambda p: now - self.away_since >= p.grace)
+            self._schedule_grace_check(now)
+            return None
+
+        if kind == "break_end":
+            finished = self.break_program
             self.break_in_progress = False
-            self.start_screen_watch_time = None
-            notify = "end_break"
+            self.break_end_time = None
+            # a break also counts as rest for shorter rules
+            self._rest(lambda p: p.grace <= finished.duration)
+            if self.looking:
+                self._start_watches(now)
+                if self.deferred:
+                    return self._start_break(self.deferred.pop(0), now)
+            return "end_break"
+        return None
+
+    def update_state(self, gaze, now=None):
+        if now is None:
+            now = time.time()
+        notify = None
+
+        looking = gaze == "center"
+        if looking != self.looking:
+            self._on_gaze_change(looking, now)
+            if looking and self.deferred and not self.break_in_progress:
+                notify = self._start_break(self.deferred.pop(0), now)
+
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            if self._stale(entry):
+                continue
+            event = self._fire(entry[2], entry[3], now)
+            notify = event or notify
 
         return notify, now
 
+    def time_to_break(self, now=None) -> float:
+        """seconds until the next program comes due (0 during a break)"""
+        if self.break_in_progress:
+            return 0
+        now = now or time.time()
+        remaining = []
+        for p in self.programs:
+            if p.watch_start is None:
+                remaining.append(p.interval)
+            else:
+                remaining.append(max(0, p.watch_start + p.interval - now))
+        return min(remaining)
+
+    def break_remaining(self, now=None) -> float:
+        if not self.break_in_progress:
+            return 0
+        return max(0, self.break_end_time - (now or time.time()))
+
+    def screen_time(self, now=None) -> float:
+        """seconds of (grace-tolerant) continuous screen time for the main program"""
+        watch_start = self.start_screen_watch_time
+        if watch_start is None:
+            return 0
+        return (now or time.time()) - watch_start
+
     def reset(self):
-        self.start_screen_watch_time = None
+        for program in self.programs:
+            program.clear()
+        self.deferred = []
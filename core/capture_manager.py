@@ -0,0 +1,231 @@
+"""
+Capture Manager - Run several cameras at once and fuse their gaze results
+"""
+import threading
+import time
+
+import cv2
+
+from utils.webcam import get_webcam_capture
+
+
+class CameraStream:
+    def __init__(self, index, priority=0, tracker=None, on_frame=None, backend=None):
+        self.index = index
+        self.priority = priority
+        self.tracker = tracker  # per-camera IrisGazeTracker
+        self.backend = backend  # per-camera landmark backend (see landmark_backends)
+        self.on_frame = on_frame
+        self.cap = None
+        self.running = False
+        self.thread = None
+        self.idle_interval = 0  # when set, only decode one frame per interval
+        self.last_decode = 0
+
+        # frames are decoded into a ring of three reused buffers: the reader
+        # never writes the newest slot or the one the frame loop is holding
+        self.lock = threading.Lock()
+        self.buffers = [None, None, None]
+        self.latest_slot = -1
+        self.held_slot = -1
+        self.frame_seq = 0
+        self.consumed_seq = 0
+        self.rgb = None
+
+        # latest analysis reported for this camera
+        self.analysis = None
+        self.result_time = 0
+        self.last_served = 0
+
+    def start(self):
+        """Open the device and start the reader thread."""
+        self.cap = get_webcam_capture(self.index)
+        self.running = True
+        self.thread = threading.Thread(target=self._reader, daemon=True)
+        self.thread.start()
+
+    def _reader(self):
+        while self.running:
+            if self.idle_interval and time.time() - self.last_decode < self.idle_interval:
+                # keep the driver queue drained without paying for decode
+                if not self.cap.grab():
+                    break
+                continue
+            with self.lock:
+                slot = 0
+                while slot == self.latest_slot or slot == self.held_slot:
+                    slot += 1
+            ret, frame = self.cap.read(self.buffers[slot])
+            if not ret:
+                break
+            self.last_decode = time.time()
+            with self.lock:
+                self.buffers[slot] = frame
+                self.latest_slot = slot
+                self.frame_seq += 1
+            if self.on_frame:
+                self.on_frame()
+        self.running = False
+        if self.on_frame:
+            self.on_frame()
+
+    def has_new_frame(self) -> bool:
+        return self.frame_seq != self.consumed_seq
+
+    def take_frame(self):
+        """
+        Return the newest frame and mark it consumed.
+        The buffer stays valid (and may be drawn on) until the next take_frame.
+        """
+        with self.lock:
+            self.consumed_seq = self.frame_seq
+            self.held_slot = self.latest_slot
+            return self.buffers[self.held_slot] if self.held_slot >= 0 else None
+
+    def peek_frame(self):
+        """Return a copy of the newest frame without consuming it."""
+        with self.lock:
+            if self.latest_slot < 0:
+                return None
+            return self.buffers[self.latest_slot].copy()
+
+    def to_rgb(self, frame):
+        """Convert to RGB into this camera's reused buffer."""
+        if self.backend is not None and self.backend.is_async:
+            # the async graph may still be reading the previous buffer
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self.rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return self.rgb
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        if self.cap:
+            self.cap.release()
+        if self.backend:
+            self.backend.close()
+
+
+class CaptureManager:
+    """
+    Opens one reader thread per camera and hands out frames for inference.
+    Only `max_per_tick` cameras are analysed per loop iteration, picked
+    round-robin or by priority, so total CPU stays bounded as cameras are added.
+    """
+
+    def __init__(self, cameras, policy="round_robin", max_per_tick=1, stale_after=1.0,
+                 tracker_factory=None, backend_factory=None):
+        # cameras: list of device indices or (index, priority) pairs
+        self.policy = policy
+        self.max_per_tick = max(1, max_per_tick)
+        self.stale_after = stale_after
+        self.new_frame = threading.Event()
+        self.streams = []
+        self.rr_offset = 0
+        self.ready = []  # reused every tick
+        self.picked = []
+        self.batch = []
+
+        for cam in cameras:
+            index, priority = cam if isinstance(cam, tuple) else (cam, 0)
+            tracker = tracker_factory() if tracker_factory else None
+            backend = backend_factory() if backend_factory else None
+            self.streams.append(CameraStream(index, priority, tracker, self.new_frame.set, backend))
+
+    @property
+    def primary(self) -> CameraStream:
+        return self.streams[0]
+
+    @property
+    def alive(self) -> bool:
+        return any(s.running for s in self.streams)
+
+    def start(self):
+        for stream in self.streams:
+            stream.start()
+
+    def set_idle(self, interval):
+        """Throttle every reader to one decoded frame per interval (0 = full rate)."""
+        for stream in self.streams:
+            stream.idle_interval = interval
+
+    def _pick(self, ready):
+        if self.policy == "priority":
+            # highest priority first, least recently served breaks ties
+            ready.sort(key=lambda s: (-s.priority, s.last_served))
+            del ready[self.max_per_tick:]
+            return ready
+
+        n = len(self.streams)
+        picked = self.picked
+        picked.clear()
+        for i in range(n):
+            stream = self.streams[(self.rr_offset + i) % n]
+            if stream in ready:
+                picked.append(stream)
+                if len(picked) == self.max_per_tick:
+                    break
+        if picked:
+            self.rr_offset = (self.streams.index(picked[-1]) + 1) % n
+        return picked
+
+    def next_batch(self, timeout=1.0):
+        """
+        Wait for fresh frames and return [(stream, frame), ...] to analyse.
+        The list is reused, so it is only valid until the next call.
+        Returns None once every camera has stopped.
+        """
+        ready = self.ready
+        batch = self.batch
+        batch.clear()
+        while True:
+            ready.clear()
+            for s in self.streams:
+                if s.has_new_frame():
+                    ready.append(s)
+            if ready:
+                break
+            if not self.alive:
+                return None
+            self.new_frame.clear()
+            # re-check after clearing so a frame landing in between isn't missed
+            if any(s.has_new_frame() for s in self.streams):
+                continue
+            if not self.new_frame.wait(timeout):
+                return batch
+
+        now = time.time()
+        for stream in self._pick(ready):
+            stream.last_served = now
+            batch.append((stream, stream.take_frame()))
+        return batch
+
+    def report(self, stream, analysis, now=None):
+        """Store the analysis for a camera (None when no face was found)."""
+        stream.analysis = analysis
+        stream.result_time = now or time.time()
+
+    def fused_gaze(self, now=None):
+        """
+        Combine per-camera results into one signal.
+        returns: (gaze, stream) where gaze is "center" if any camera sees the
+        user looking at its screen, and stream is the camera that decided it
+        (None when no camera currently sees a face)
+        """
+        now = now or time.time()
+        best = None
+        for stream in self.streams:
+            if stream.analysis is None or now - stream.result_time > self.stale_after:
+                continue
+            if stream.analysis.gaze_direction == "center":
+                return "center", stream
+            if best is None or stream.result_time > best.result_time:
+                best = stream
+        if best is None:
+            return "away", None
+        return best.analysis.gaze_direction, best
+
+    def release(self):
+        for stream in self.streams:
+            stream.stop()
@@ -0,0 +1,103 @@
+"""
+Distance Estimator - Approximate viewing distance from iris size and head pose
+"""
+import math
+
+import numpy as np
+
+# the human iris is ~11.7mm across with very little variation between adults
+IRIS_DIAMETER_MM = 11.7
+
+
+class StreamingQuantile:
+    """
+    O(1) streaming quantile estimate with constant memory.
+    The first `warmup` samples fill a preallocated buffer, and one selection
+    seeds the estimate with their exact quantile. After that it steps towards
+    each new sample by at most `rate` of its value per second of `dt`, so how
+    fast it drifts doesn't depend on the frame rate.
+    """
+
+    def __init__(self, q=0.5, rate=0.0001, warmup=30, max_dt=1.0):
+        self.q = q
+        self.rate = rate  # fraction of the estimate per second
+        self.warmup = warmup
+        self.max_dt = max_dt  # a long gap doesn't count as a long adaptation
+        self.samples = np.empty(warmup, dtype=np.float64)
+        self.count = 0
+        self.value = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, x: float, dt: float = 0.0) -> float:
+        if self.value is None:
+            self.samples[self.count] = x
+            self.count += 1
+            if self.count == self.warmup:
+                k = int(self.q * (self.warmup - 1))
+                self.samples.partition(k)
+                self.value = float(self.samples[k])
+            return self.value
+
+        step = abs(self.value) * self.rate * min(max(dt, 0.0), self.max_dt)
+        if x > self.value:
+            self.value = min(x, self.value + step * self.q * 2)
+        elif x < self.value:
+            self.value = max(x, self.value - step * (1 - self.q) * 2)
+        return self.value
+
+    def reset(self):
+        self.count = 0
+        self.value = None
+
+
+class DistanceEstimator:
+    def __init__(self, too_close_ratio=1.3, warmup_frames=30, adapt_rate=0.0001, smoothing=0.3):
+        self.too_close_ratio = too_close_ratio
+        self.smoothing = smoothing
+        # adapt_rate is per second: 0.0001 lets the baseline drift ~0.6% a minute
+        self.baseline = StreamingQuantile(0.5, adapt_rate, warmup_frames)
+        self.distance_mm = None
+        self.too_close = False
+        self.last_time = None
+
+    def update(self, iris_diameter_px, frame_width, yaw=0.0, pitch=0.0, now=None):
+        """
+        Feed one frame's iris diameter (head angles in radians, now in seconds).
+        returns: smoothed distance to the camera in mm, or None
+        """
+        if iris_diameter_px <= 0:
+            return self.distance_mm
+
+        # a turned head shrinks the iris along that axis - undo it
+        diameter = iris_diameter_px * 2 / (max(math.cos(yaw), 0.5) + max(math.cos(pitch), 0.5))
+
+        # pinhole model, focal length roughly equals frame width for webcams
+        distance = frame_width * IRIS_DIAMETER_MM / diameter
+        if self.distance_mm is None:
+            self.distance_mm = distance
+        else:
+            self.distance_mm += self.smoothing * (distance - self.distance_mm)
+
+        dt = 0.0 if self.last_time is None or now is None else now - self.last_time
+        self.last_time = now
+
+        if self.baseline.ready:
+            self.too_close = self.baseline.value / self.distance_mm > self.too_close_ratio
+        else:
+            self.too_close = False
+
+        # don't learn a leaning-in posture as the new normal
+        if not self.too_close:
+            self.baseline.update(self.distance_mm, dt)
+
+        return self.distance_mm
+
+    def reset(self):
+        """Recalibrate from scratch (user changed position)"""
+        self.baseline.reset()
+        self.distance_mm = None
+        self.too_close = False
+        self.last_time = None
@@ -0,0 +1,117 @@
+"""
+Duty Cycle - Passive monitoring that only opens the camera for short bursts
+"""
+import time
+
+import cv2
+
+from utils.webcam import get_webcam_capture
+
+
+class DutyCycleMonitor:
+    """
+    Opens the camera, reads a short burst, releases it and sleeps until the
+    next sample. Between samples the gaze state is assumed to have changed
+    halfway, and BreakManager / SessionTracker are fed accordingly.
+    The sampling interval tightens as a break deadline gets close.
+    """
+
+    def __init__(self, camera_index, tracker, break_manager, session_tracker, on_break_event=None,
+                 burst_frames=5, settle_frames=5, min_interval=5.0, max_interval=60.0):
+        self.camera_index = camera_index
+        self.tracker = tracker
+        self.break_manager = break_manager
+        self.session_tracker = session_tracker
+        self.on_break_event = on_break_event
+        self.burst_frames = burst_frames
+        self.settle_frames = settle_frames  # let auto-exposure settle before analysing
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        # time between samples is real screen time, not a dropped-frame gap
+        session_tracker.max_gap = max(session_tracker.max_gap, max_interval * 2)
+
+        self.last_sample = None
+        self.last_gaze = "away"
+
+    def capture_burst(self):
+        try:
+            cap = get_webcam_capture(self.camera_index)
+        except RuntimeError as e:
+            print(f"Sample skipped: {e}")
+            return []
+
+        frames = []
+        try:
+            for _ in range(self.settle_frames):
+                cap.grab()
+            for _ in range(self.burst_frames):
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frames.append(frame)
+        finally:
+            cap.release()
+        return frames
+
+    def analyse(self, frames):
+        """
+        majority gaze over the burst
+        returns: (face_found, gaze)
+        """
+        votes = {}
+        for frame in frames:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            results = self.tracker.face_mesh.process(rgb)
+            if results.multi_face_landmarks:
+                landmarks = results.multi_face_landmarks[0].landmark
+                gaze = self.tracker.get_gaze_analysis(landmarks, frame.shape)["gaze_direction"]
+                votes[gaze] = votes.get(gaze, 0) + 1
+        if not votes:
+            return False, "away"
+        return True, max(votes, key=votes.get)
+
+    def _feed_breaks(self, gaze, now):
+        event, _ = self.break_manager.update_state(gaze, now)
+        if event and self.on_break_event:
+            self.on_break_event(event)
+
+    def sample(self):
+        face_found, gaze = self.analyse(self.capture_burst())
+        now = time.time()
+
+        if self.last_sample is not None:
+            # deadlines before the midpoint see the old state, the rest see the new one
+            midpoint = (self.last_sample + now) / 2
+            self._feed_breaks(self.last_gaze, midpoint)
+            self.session_tracker.update(self.last_gaze == "center", midpoint)
+            self._feed_breaks(gaze, midpoint)
+
+        self._feed_breaks(gaze, now)
+        self.session_tracker.update(gaze == "center", now)
+
+        self.last_sample = now
+        self.last_gaze = gaze
+        return face_found, gaze
+
+    def next_interval(self, now=None) -> float:
+        """sample sparsely when the next deadline is far away, densely when near"""
+        if self.break_manager.break_in_progress:
+            deadline = self.break_manager.break_remaining(now)
+        else:
+            deadline = self.break_manager.time_to_break(now)
+        return max(self.min_interval, min(self.max_interval, deadline / 4))
+
+    def run(self, should_continue):
+        """Sample until should_continue() returns False."""
+        try:
+            while should_continue():
+                face_found, gaze = self.sample()
+                interval = self.next_interval()
+                print(f"Sample: {gaze if face_found else 'no face'} - next in {interval:.0f}s")
+
+                wake = time.time() + interval
+                while should_continue() and time.time() < wake:
+                    time.sleep(min(0.5, max(0, wake - time.time())))
+        except KeyboardInterrupt:
+            pass
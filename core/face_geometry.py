@@ -0,0 +1,177 @@
+"""
+Face Geometry - Iris size and head pose from refined FaceMesh landmarks
+"""
+import math
+
+import cv2
+import numpy as np
+
+# iris ring landmarks from refine_landmarks=True, one row per eye
+IRIS_RINGS = ((469, 470, 471, 472), (474, 475, 476, 477))
+
+# landmarks used for head pose: nose tip, chin, outer eye corners, mouth corners
+POSE_LANDMARKS = (1, 152, 33, 263, 61, 291)
+
+# canonical face in mm, camera-style axes (x image right, y down, z away from camera)
+CANONICAL_FACE = np.array([
+    (0.0, 0.0, 0.0),       # nose tip
+    (0.0, 63.0, 12.0),     # chin
+    (-43.0, -32.0, 26.0),  # eye outer corner (image left)
+    (43.0, -32.0, 26.0),   # eye outer corner (image right)
+    (-28.0, 28.0, 24.0),   # mouth corner (image left)
+    (28.0, 28.0, 24.0),    # mouth corner (image right)
+], dtype=np.float64)
+
+
+class CircleFitter:
+    """
+    Least-squares (Kasa) circle fit for a fixed batch of n sets of k points,
+    computed into buffers allocated once.
+    Centering the points zeroes the sums of x and y, so the normal equations
+    of x^2 + y^2 = 2ax + 2by + c reduce to a 2x2 system plus c = mean(x^2 + y^2).
+    """
+
+    def __init__(self, n, k):
+        self.k = k
+        self.mean = np.empty((n, 1, 2))
+        self.centered = np.empty((n, k, 2))
+        self.x = self.centered[..., 0]
+        self.y = self.centered[..., 1]
+        self.xx, self.yy, self.xy, self.b, self.tmp = (np.empty((n, k)) for _ in range(5))
+        self.sxx, self.syy, self.sxy, self.sxb, self.syb, self.sb, self.det, self.a2, self.b2, self.t = \
+            (np.empty(n) for _ in range(10))
+        self.radii = np.empty(n)
+
+    def fit(self, points: np.ndarray) -> np.ndarray:
+        """points: (n, k, 2); returns the n fitted radii (reused buffer)"""
+        np.mean(points, axis=1, keepdims=True, out=self.mean)
+        np.subtract(points, self.mean, out=self.centered)
+        x, y = self.x, self.y
+
+        np.multiply(x, x, out=self.xx)
+        np.multiply(y, y, out=self.yy)
+        np.multiply(x, y, out=self.xy)
+        np.add(self.xx, self.yy, out=self.b)
+        np.sum(self.xx, axis=1, out=self.sxx)
+        np.sum(self.yy, axis=1, out=self.syy)
+        np.sum(self.xy, axis=1, out=self.sxy)
+        np.sum(self.b, axis=1, out=self.sb)
+        np.multiply(x, self.b, out=self.tmp)
+        np.sum(self.tmp, axis=1, out=self.sxb)
+        np.multiply(y, self.b, out=self.tmp)
+        np.sum(self.tmp, axis=1, out=self.syb)
+
+        # det = sxx * syy - sxy^2
+        np.multiply(self.sxx, self.syy, out=self.det)
+        np.multiply(self.sxy, self.sxy, out=self.t)
+        np.subtract(self.det, self.t, out=self.det)
+
+        # 2a = (sxb * syy - syb * sxy) / det, 2b = (syb * sxx - sxb * sxy) / det
+        np.multiply(self.sxb, self.syy, out=self.a2)
+        np.multiply(self.syb, self.sxy, out=self.t)
+        np.subtract(self.a2, self.t, out=self.a2)
+        np.divide(self.a2, self.det, out=self.a2)
+        np.multiply(self.syb, self.sxx, out=self.b2)
+        np.multiply(self.sxb, self.sxy, out=self.t)
+        np.subtract(self.b2, self.t, out=self.b2)
+        np.divide(self.b2, self.det, out=self.b2)
+
+        # r^2 = c + a^2 + b^2
+        np.multiply(self.a2, self.a2, out=self.radii)
+        np.multiply(self.b2, self.b2, out=self.t)
+        np.add(self.radii, self.t, out=self.radii)
+        np.multiply(self.radii, 0.25, out=self.radii)
+        np.multiply(self.sb, 1.0 / self.k, out=self.t)
+        np.add(self.radii, self.t, out=self.radii)
+        np.maximum(self.radii, 0.0, out=self.radii)
+        return np.sqrt(self.radii, out=self.radii)
+
+
+def fit_circle_radii(points: np.ndarray) -> np.ndarray:
+    """
+    Least-squares (Kasa) circle fit for a batch of point sets.
+    points: (n, k, 2) array, returns the n fitted radii
+    """
+    n, k = points.shape[:2]
+    return CircleFitter(n, k).fit(points)
+
+
+class FaceGeometry:
+    def __init__(self):
+        # reused every frame
+        self.ring_points = np.empty((2, 4, 2), dtype=np.float64)
+        self.circle_fit = CircleFitter(2, 4)
+        self.pose_points = np.empty((len(POSE_LANDMARKS), 2), dtype=np.float64)
+        self.rot = np.empty((3, 3), dtype=np.float64)
+        self.jacobian = np.empty((3, 9), dtype=np.float64)
+        self.camera_matrix = None
+        self.camera_shape = None
+        self.dist_coeffs = np.zeros((4, 1), dtype=np.float64)
+
+        # pose written in place by solvePnP; the previous one seeds the solver
+        self.rvec = np.zeros((3, 1), dtype=np.float64)
+        self.tvec = np.zeros((3, 1), dtype=np.float64)
+        self.has_pose = False
+
+        # latest results
+        self.iris_radii = None
+        self.yaw = 0.0    # radians, positive when the face turns towards image right
+        self.pitch = 0.0  # radians, positive when looking down
+        self.roll = 0.0
+
+    def _get_camera_matrix(self, frame_shape):
+        h, w = frame_shape[:2]
+        if self.camera_shape != (h, w):
+            # webcam focal length is roughly the frame width in pixels
+            self.camera_matrix = np.array([
+                [w, 0, w / 2],
+                [0, w, h / 2],
+                [0, 0, 1],
+            ], dtype=np.float64)
+            self.camera_shape = (h, w)
+            self.has_pose = False
+        return self.camera_matrix
+
+    def iris_diameter(self) -> float:
+        """mean iris diameter of both eyes in pixels"""
+        if self.iris_radii is None:
+            return 0.0
+        return float(self.iris_radii.mean() * 2)
+
+    def update(self, landmarks, frame_shape):
+        """Recompute iris size and head pose for a new frame of landmarks."""
+        h, w = frame_shape[:2]
+
+        ring = self.ring_points
+        for eye, indices in enumerate(IRIS_RINGS):
+            for i, idx in enumerate(indices):
+                ring[eye, i, 0] = landmarks[idx].x * w
+                ring[eye, i, 1] = landmarks[idx].y * h
+        self.iris_radii = self.circle_fit.fit(ring)
+
+        pts = self.pose_points
+        for i, idx in enumerate(POSE_LANDMARKS):
+            pts[i, 0] = landmarks[idx].x * w
+            pts[i, 1] = landmarks[idx].y * h
+
+        camera_matrix = self._get_camera_matrix(frame_shape)
+        ok, rvec, tvec = cv2.solvePnP(
+            CANONICAL_FACE, pts, camera_matrix, self.dist_coeffs,
+            rvec=self.rvec, tvec=self.tvec, useExtrinsicGuess=self.has_pose,
+            flags=cv2.SOLVEPNP_ITERATIVE,
+        )
+        self.has_pose = bool(ok)
+        if not ok:
+            return self
+
+        self.rvec, self.tvec = rvec, tvec  # the same arrays unless OpenCV had to reallocate
+        rot, _ = cv2.Rodrigues(rvec, self.rot, self.jacobian)
+        # rotation about y turns the face; the sign flip makes "towards image right" positive
+        self.yaw = -math.atan2(-rot[2, 0], math.hypot(rot[2, 1], rot[2, 2]))
+        self.pitch = math.atan2(rot[2, 1], rot[2, 2])
+        self.roll = math.atan2(rot[1, 0], rot[0, 0])
+        return self
+
+    def reset(self):
+        self.has_pose = False
+        self.yaw = self.pitch = self.roll = 0.0
@@ -0,0 +1,288 @@
+"""
+Gaze Calibration - Map iris/head features to screen coordinates and keep
+a decayed on-screen gaze density map
+"""
+import json
+import math
+import os
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+# 3x3 grid of targets in normalised screen coordinates
+CALIBRATION_POINTS = [(x, y) for y in (0.1, 0.5, 0.9) for x in (0.1, 0.5, 0.9)]
+
+
+class GazeCalibration:
+    """
+    Per-user ridge regression from gaze features (iris x/y within the eye,
+    head yaw/pitch) to normalised screen coordinates.
+    """
+
+    def __init__(self, path="gaze_calibration.json", ridge=1e-2):
+        self.path = path
+        self.ridge = ridge
+        self.mean = None
+        self.std = None
+        self.weights = None  # (terms, 2)
+        self.rms_error = None
+        # reused by map()
+        self.z = np.empty(4)
+        self.phi = np.empty(6)
+        self.point = np.empty(2)
+
+    @property
+    def fitted(self) -> bool:
+        return self.weights is not None
+
+    @staticmethod
+    def _design(z, out):
+        # bias, linear terms and the x*y interaction of the iris offsets
+        out[..., 0] = 1.0
+        out[..., 1:5] = z
+        out[..., 5] = z[..., 0] * z[..., 1]
+        return out
+
+    def fit(self, features, targets) -> bool:
+        """
+        features: (n, 4) samples, targets: (n, 2) screen points they were taken at
+        returns: False if there isn't enough spread to fit
+        """
+        features = np.asarray(features, dtype=np.float64)
+        targets = np.asarray(targets, dtype=np.float64)
+        if len(features) < 6 or len(np.unique(targets, axis=0)) < 5:
+            return False
+
+        self.mean = features.mean(axis=0)
+        self.std = features.std(axis=0)
+        self.std[self.std < 1e-6] = 1.0
+        phi = self._design((features - self.mean) / self.std, np.empty((len(features), 6)))
+
+        # (phi^T phi + ridge I) w = phi^T y, bias left unpenalised
+        penalty = np.eye(6) * self.ridge * len(features)
+        penalty[0, 0] = 0
+        self.weights = np.linalg.solve(phi.T @ phi + penalty, phi.T @ targets)
+        residual = phi @ self.weights - targets
+        self.rms_error = float(np.sqrt((residual ** 2).sum(axis=1).mean()))
+        return True
+
+    def map(self, features):
+        """(x, y) in normalised screen coordinates (reused array), or None if uncalibrated"""
+        if self.weights is None or features is None:
+            return None
+        np.subtract(features, self.mean, out=self.z)
+        np.divide(self.z, self.std, out=self.z)
+        self._design(self.z, self.phi)
+        return np.matmul(self.phi, self.weights, out=self.point)
+
+    def save(self):
+        data = {
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+            "weights": self.weights.tolist(),
+            "rms_error": self.rms_error,
+        }
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(data, f, indent=2)
+        except Exception as e:
+            print(f"Error saving gaze calibration: {e}")
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.mean = np.array(data["mean"])
+            self.std = np.array(data["std"])
+            self.weights = np.array(data["weights"])
+            self.rms_error = data.get("rms_error")
+            return True
+        except:
+            return False
+
+
+class CalibrationRoutine:
+    """
+    Walks through the calibration targets inside the frame loop: each dot is
+    shown for `settle` seconds before samples are taken for `dwell` seconds.
+    A dot that can't collect `min_samples` (no face) is skipped after `timeout`.
+    """
+
+    def __init__(self, calibration, points=CALIBRATION_POINTS, settle=0.8, dwell=1.2,
+                 min_samples=5, timeout=5.0, canvas_size=(1280, 720)):
+        self.calibration = calibration
+        self.points = points
+        self.settle = settle
+        self.dwell = dwell
+        self.min_samples = min_samples
+        self.timeout = timeout
+        self.canvas = np.zeros((canvas_size[1], canvas_size[0], 3), dtype=np.uint8)
+
+        self.features = []
+        self.targets = []
+        self.index = 0
+        self.point_start = None
+        self.point_samples = 0
+
+    def start(self, now):
+        self.features.clear()
+        self.targets.clear()
+        self.index = 0
+        self.point_start = now
+        self.point_samples = 0
+
+    @property
+    def active(self) -> bool:
+        return self.point_start is not None and self.index < len(self.points)
+
+    def update(self, features, now):
+        """
+        feed this tick's gaze features (None if no face)
+        returns: "done", "failed" or None while still running
+        """
+        shown = now - self.point_start
+        if features is not None and shown >= self.settle:
+            self.features.append(np.array(features))
+            self.targets.append(self.points[self.index])
+            self.point_samples += 1
+
+        enough = self.point_samples >= self.min_samples and shown >= self.settle + self.dwell
+        if enough or shown >= self.timeout:
+            self.index += 1
+            self.point_start = now
+            self.point_samples = 0
+            if self.index == len(self.points):
+                if not self.calibration.fit(self.features, self.targets):
+                    return "failed"
+                self.calibration.save()
+                return "done"
+        return None
+
+    def draw(self, now):
+        """target dot on a black screen-sized canvas, shrinking while sampling"""
+        canvas = self.canvas
+        canvas.fill(0)
+        h, w = canvas.shape[:2]
+        x, y = self.points[self.index]
+        center = (int(x * w), int(y * h))
+        progress = min(1.0, max(0.0, (now - self.point_start - self.settle) / self.dwell))
+        cv2.circle(canvas, center, int(24 - 16 * progress), (0, 200, 255), -1)
+        cv2.circle(canvas, center, 3, (255, 255, 255), -1)
+        cv2.putText(canvas, f"Look at the dot ({self.index + 1}/{len(self.points)})", (30, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 2)
+        return canvas
+
+
+class GazeHeatmap:
+    """
+    Exponentially decayed 2D histogram of where on screen the user looks.
+    The grid is fixed size; decay is applied lazily by growing the weight of
+    new samples and rebasing the whole grid only occasionally, so each sample
+    costs one cell update.
+    """
+
+    REBASE_EXPONENT = 30.0  # rebase before weights grow past e^30
+    STOP = object()
+
+    def __init__(self, path="gaze_heatmap.npz", cols=64, rows=36, half_life=4 * 3600.0):
+        self.path = path
+        self.grid = np.zeros((rows, cols), dtype=np.float64)
+        self.view = np.empty_like(self.grid)
+        self.tau = half_life / math.log(2)
+        self.ref_time = None  # true density = grid * exp(-(now - ref_time) / tau)
+
+        # periodic saves are written by a background thread from a copy of the grid
+        self.save_queue = queue.Queue(maxsize=1)
+        self.writer = None
+
+    def add(self, x, y, now, weight=1.0) -> bool:
+        """Count `weight` seconds of gaze at normalised (x, y); off-screen points are ignored."""
+        if not (0.0 <= x < 1.0 and 0.0 <= y < 1.0):
+            return False
+        if self.ref_time is None:
+            self.ref_time = now
+        exponent = (now - self.ref_time) / self.tau
+        if exponent > self.REBASE_EXPONENT:
+            self._rebase(now)
+            exponent = 0.0
+        rows, cols = self.grid.shape
+        self.grid[int(y * rows), int(x * cols)] += weight * math.exp(exponent)
+        return True
+
+    def _rebase(self, now):
+        self.grid *= math.exp(-(now - self.ref_time) / self.tau)
+        self.ref_time = now
+
+    def density(self, now) -> np.ndarray:
+        """decayed seconds of gaze per cell, as of `now` (reused buffer)"""
+        if self.ref_time is None:
+            self.view.fill(0)
+        else:
+            np.multiply(self.grid, math.exp(-(now - self.ref_time) / self.tau), out=self.view)
+        return self.view
+
+    def render(self, now, size=(640, 360), colormap=cv2.COLORMAP_INFERNO) -> np.ndarray:
+        grid = self.density(now)
+        peak = float(grid.max())
+        scaled = np.zeros(grid.shape, dtype=np.uint8) if peak <= 0 else \
+            (grid * (255.0 / peak)).astype(np.uint8)
+        image = cv2.applyColorMap(cv2.resize(scaled, size, interpolation=cv2.INTER_CUBIC), colormap)
+        cv2.putText(image, "Where you looked on screen", (10, 25),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (230, 230, 230), 1)
+        return image
+
+    def save(self):
+        """Write the heatmap now, on the calling thread (use at shutdown, after close())."""
+        self._write(self.grid, self.ref_time)
+
+    def save_in_background(self) -> bool:
+        """Queue a copy of the grid for the writer thread; False if the previous save is still pending."""
+        if self.writer is None:
+            self.writer = threading.Thread(target=self._run_writer, daemon=True)
+            self.writer.start()
+        try:
+            self.save_queue.put_nowait((self.grid.copy(), self.ref_time))
+            return True
+        except queue.Full:
+            return False
+
+    def close(self, timeout=5.0):
+        """Let a pending background save finish and stop the writer."""
+        if self.writer is None:
+            return
+        self.save_queue.put(self.STOP)
+        self.writer.join(timeout)
+        self.writer = None
+
+    def _run_writer(self):
+        while True:
+            item = self.save_queue.get()
+            if item is self.STOP:
+                return
+            self._write(*item)
+
+    def _write(self, grid, ref_time):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, grid=grid, ref_time=np.float64(ref_time or 0))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving gaze heatmap: {e}")
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with np.load(self.path) as data:
+                if data["grid"].shape != self.grid.shape:
+                    return False
+                self.grid[:] = data["grid"]
+                self.ref_time = float(data["ref_time"]) or None
+            return True
+        except:
+            return False
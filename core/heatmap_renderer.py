@@ -0,0 +1,83 @@
+"""
+Heatmap Renderer - Hour x day screen-time images for week, month and year views
+"""
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+
+
+class HeatmapRenderer:
+    # view -> (days shown, cell width, cell height)
+    VIEWS = {
+        "week": (7, 48, 14),
+        "month": (30, 16, 14),
+        "year": (365, 3, 10),
+    }
+
+    def __init__(self, session_tracker, colormap=cv2.COLORMAP_INFERNO):
+        self.tracker = session_tracker
+        self.colormap = colormap
+        self.cache = {}  # (view, end day) -> (revision, image)
+        self.saved = {}  # path -> (revision, view, end day)
+
+    def build_grid(self, days, end=None) -> np.ndarray:
+        """minutes per hour as a (24, days) float array, oldest day first"""
+        end = end or datetime.now()
+        daily = self.tracker.all_data.get("daily", {})
+
+        cols, rows, values = [], [], []
+        for col in range(days):
+            day = (end - timedelta(days=days - 1 - col)).strftime("%Y-%m-%d")
+            for hour, minutes in daily.get(day, {}).items():
+                cols.append(col)
+                rows.append(int(hour))
+                values.append(minutes)
+
+        grid = np.zeros((24, days), dtype=np.float32)
+        if values:
+            grid[rows, cols] = values
+        return grid
+
+    def colorize(self, grid, cell_w, cell_h) -> np.ndarray:
+        """scale to 0-255, apply the colormap and blow cells up, all in whole-array ops"""
+        peak = float(grid.max())
+        scaled = np.zeros(grid.shape, dtype=np.uint8) if peak <= 0 else \
+            (grid * (255.0 / peak)).astype(np.uint8)
+        colored = cv2.applyColorMap(scaled, self.colormap)
+        h, w = grid.shape
+        return cv2.resize(colored, (w * cell_w, h * cell_h), interpolation=cv2.INTER_NEAREST)
+
+    def render(self, view="week", end=None) -> np.ndarray:
+        """BGR image for a view; reused until the tracker's rollups change"""
+        end = end or datetime.now()
+        key = (view, end.strftime("%Y-%m-%d"))
+        cached = self.cache.get(key)
+        if cached and cached[0] == self.tracker.revision:
+            return cached[1]
+
+        days, cell_w, cell_h = self.VIEWS[view]
+        grid = self.build_grid(days, end)
+        body = self.colorize(grid, cell_w, cell_h)
+
+        # margins for hour labels and a title
+        image = cv2.copyMakeBorder(body, 30, 10, 45, 10, cv2.BORDER_CONSTANT, value=(30, 30, 30))
+        for hour in range(0, 24, 6):
+            cv2.putText(image, f"{hour:02d}:00", (5, 30 + hour * cell_h + cell_h),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.35, (200, 200, 200), 1)
+        total_hours = float(grid.sum()) / 60
+        cv2.putText(image, f"Screen time - last {days} days ({total_hours:.0f}h)", (45, 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.45, (230, 230, 230), 1)
+
+        self.cache[key] = (self.tracker.revision, image)
+        return image
+
+    def save(self, view="week", path=None, end=None) -> str:
+        """Write the view as PNG; skipped if that file is already up to date."""
+        end = end or datetime.now()
+        path = path or f"heatmap_{view}.png"
+        stamp = (self.tracker.revision, view, end.strftime("%Y-%m-%d"))
+        if self.saved.get(path) != stamp:
+            cv2.imwrite(path, self.render(view, end))
+            self.saved[path] = stamp
+        return path
@@ -1,24 +1,69 @@
 import cv2
+import json
+import os
 import numpy as np
 import mediapipe as mp
 import time
-from typing import Tuple, Optional
+from typing import Optional
 
+from .distance_estimator import DistanceEstimator
+from .face_geometry import FaceGeometry
+
+
+class GazeAnalysis:
+    """
+    Per-frame analysis record, reused by its tracker every frame.
+    Fields are attributes; item access is kept for older dict-style callers.
+    """
+    __slots__ = ("gaze_direction", "is_blinking", "blink_rate", "iris_diameter",
+                 "iris_positions", "too_close", "distance_cm", "gaze_features",
+                 "screen_point", "timestamp")
 
-class IrisGazeTracker:
     def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+
+# tuning file keys -> IrisGazeTracker attributes (see core.threshold_sweep)
+TUNING_KEYS = {
+    "gaze_threshold": "GAZE_THRESHOLD",
+    "blink_threshold": "BLINK_EAR_THRESHOLD",
+    "blink_min_frames": "BLINK_MIN_FRAMES",
+    "blink_cooldown": "BLINK_COOLDOWN",
+    "blink_reopen_frames": "BLINK_REOPEN_FRAMES",
+    "too_close_ratio": "TOO_CLOSE_THRESHOLD",
+}
+
+
+def load_tuning(path) -> dict:
+    """tuned thresholds from a sweep export, or {} to keep the defaults"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return {k: v for k, v in data.items() if k in TUNING_KEYS}
+    except Exception as e:
+        print(f"Error loading tuning file {path}: {e}")
+        return {}
+
+
+class IrisGazeTracker:
+    def __init__(self, clock=time.time, tuning=None):
+        
+        # time source - wall clock live, video timestamps in batch analysis
+        self.clock = clock
         
         # initialize mediapipe
         self.mp_face_mesh = mp.solutions.face_mesh
         self.mp_iris = mp.solutions.face_mesh
         
-        # face mesh with iris landmarks
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.8,
-            min_tracking_confidence=0.8
-        )
+        # face mesh with iris landmarks - created on first use, since a
+        # landmark backend may be feeding this tracker instead
+        self._face_mesh = None
         
         # iris landmark indices
         self.LEFT_IRIS_CENTER = 468
@@ -32,6 +77,22 @@ class IrisGazeTracker:
         self.LEFT_EYE_TOP_BOTTOM = [159, 145]
         self.RIGHT_EYE_TOP_BOTTOM = [386, 374]
         
+        # blendshape blink score (FaceLandmarker backend) above which eyes count as closed
+        self.BLINK_SCORE_THRESHOLD = 0.5
+        
+        # reused analysis record
+        self.analysis = GazeAnalysis()
+        
+        # gaze: iris ratio offset from 0.5 that still counts as center
+        self.GAZE_THRESHOLD = 0.15
+        
+        # blinks: EAR below threshold for min_frames, counted once the eye has been
+        # open for reopen_frames and at least cooldown seconds after the last one
+        self.BLINK_EAR_THRESHOLD = 0.15
+        self.BLINK_MIN_FRAMES = 3
+        self.BLINK_COOLDOWN = 1.0
+        self.BLINK_REOPEN_FRAMES = 2
+        
         # tracking variables
         self.blink_counter = 0
         self.blink_start_time = None
@@ -39,16 +100,46 @@ class IrisGazeTracker:
         self.prev_is_blinking = False
         self.current_blink_frames = 0
         self.current_open_frames = 0
+        self.last_closed_frames = 0
         
         # distance detection
-        self.baseline_face_width = None
-        self.face_width_samples = []
         self.TOO_CLOSE_THRESHOLD = 1.3
-        
-    def get_iris_position(self, landmarks, frame_shape) -> Optional[Tuple[float, float, float, float]]:
+        self.distance = DistanceEstimator(too_close_ratio=self.TOO_CLOSE_THRESHOLD)
+        
+        # iris size and head pose, refreshed once per frame in get_gaze_analysis
+        self.geometry = FaceGeometry()
+        self.GAZE_YAW_GAIN = 0.5  # iris ratio shift per radian of head yaw
+        
+        if tuning:
+            self.apply_tuning(tuning)
+        
+        # screen-coordinate mapping (GazeCalibration), set once the user has calibrated
+        self.calibration = None
+        self.features = np.zeros(4)  # reused (iris x, iris y, yaw, pitch)
+        self.iris_positions = np.zeros(4)  # reused (left x, left y, right x, right y)
+        
+    def apply_tuning(self, tuning: dict):
+        """Override thresholds with values from a tuning file (see load_tuning)."""
+        for key, value in tuning.items():
+            if key in TUNING_KEYS:
+                setattr(self, TUNING_KEYS[key], value)
+        self.distance.too_close_ratio = self.TOO_CLOSE_THRESHOLD
+    
+    @property
+    def face_mesh(self):
+        if self._face_mesh is None:
+            self._face_mesh = self.mp_face_mesh.FaceMesh(
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=0.8,
+                min_tracking_confidence=0.8
+            )
+        return self._face_mesh
+    
+    def get_iris_position(self, landmarks, frame_shape) -> Optional[np.ndarray]:
         """
         get precise iris positions for both eyes
-        returns: (left_iris_x, left_iris_y, right_iris_x, right_iris_y) or none
+        returns: the tracker's reused (left_iris_x, left_iris_y, right_iris_x, right_iris_y) array, or none
         """
         if not landmarks:
             return None
@@ -59,22 +150,23 @@ class IrisGazeTracker:
         left_iris = landmarks[self.LEFT_IRIS_CENTER]
         right_iris = landmarks[self.RIGHT_IRIS_CENTER]
         
-        left_x = left_iris.x * w
-        left_y = left_iris.y * h
-        right_x = right_iris.x * w  
-        right_y = right_iris.y * h
-        
-        return (left_x, left_y, right_x, right_y)
+        positions = self.iris_positions
+        positions[0] = left_iris.x * w
+        positions[1] = left_iris.y * h
+        positions[2] = right_iris.x * w
+        positions[3] = right_iris.y * h
+        return positions
     
     def calculate_gaze_direction(self, landmarks, frame_shape) -> str:
         """
         calculate gaze direction using iris tracking
         """
         iris_pos = self.get_iris_position(landmarks, frame_shape)
-        if not iris_pos:
+        if iris_pos is None:
             return "away"
             
-        left_iris_x, left_iris_y, right_iris_x, right_iris_y = iris_pos
+        left_iris_x = iris_pos[0]
+        right_iris_x = iris_pos[2]
         h, w = frame_shape[:2]
         
         # get eye corner landmarks for reference
@@ -95,8 +187,11 @@ class IrisGazeTracker:
             # average both eyes for final position
             avg_relative = (left_relative + right_relative) / 2
             
+            # eyes counter-rotate when the head turns, so add head yaw back in
+            avg_relative += self.geometry.yaw * self.GAZE_YAW_GAIN
+            
             # threshold-based detection
-            threshold = 0.15
+            threshold = self.GAZE_THRESHOLD
             
             if avg_relative < (0.5 - threshold):
                 return "left"
@@ -107,13 +202,45 @@ class IrisGazeTracker:
         
         return "center"  # default safe fallback
     
-    def detect_blink(self, landmarks, frame_shape) -> bool:
+    def get_gaze_features(self, landmarks, frame_shape) -> Optional[np.ndarray]:
+        """
+        iris offset within each eye (x along the corner line, y from it, both
+        in eye widths) averaged over both eyes, plus head yaw and pitch
+        returns the tracker's reused feature array, or None
+        """
+        if not landmarks:
+            return None
+        
+        h, w = frame_shape[:2]
+        offset_x = offset_y = 0.0
+        for iris_idx, (inner_idx, outer_idx) in ((self.LEFT_IRIS_CENTER, self.LEFT_EYE_CORNERS),
+                                                 (self.RIGHT_IRIS_CENTER, self.RIGHT_EYE_CORNERS)):
+            iris, inner, outer = landmarks[iris_idx], landmarks[inner_idx], landmarks[outer_idx]
+            eye_width = abs((outer.x - inner.x) * w)
+            if eye_width <= 0:
+                return None
+            offset_x += (iris.x - inner.x) * w / eye_width
+            offset_y += (iris.y - (inner.y + outer.y) / 2) * h / eye_width
+        
+        features = self.features
+        features[0] = offset_x / 2
+        features[1] = offset_y / 2
+        features[2] = self.geometry.yaw
+        features[3] = self.geometry.pitch
+        return features
+    
+    def detect_blink(self, landmarks, frame_shape, blendshapes=None) -> bool:
         """
         detect if user is blinking using eye aspect ratio
-        Uses multiple landmarks for more accurate detection
+        Uses multiple landmarks for more accurate detection, or the eyeBlink
+        blendshape scores when the landmark backend provides them
         """
         if not landmarks:
             return False
+        
+        if blendshapes:
+            blink_score = (blendshapes.get("eyeBlinkLeft", 0) + blendshapes.get("eyeBlinkRight", 0)) / 2
+            return self._count_blink(blink_score > self.BLINK_SCORE_THRESHOLD)
             
         h, w = frame_shape[:2]
         
@@ -146,29 +273,31 @@ class IrisGazeTracker:
             return False
         
         # blink threshold - ear typically drops below 0.2 during blink
-        blink_threshold = 0.15
-        
-        is_blinking = avg_ear < blink_threshold
-
-        now_ts = time.time()
+        return self._count_blink(avg_ear < self.BLINK_EAR_THRESHOLD)
+    
+    def _count_blink(self, is_blinking) -> bool:
+        """update the closed/open frame runs and count completed blinks"""
+        now_ts = self.clock()
 
         # track consecutive closed/open eye frames
         if is_blinking:
             self.current_blink_frames += 1
             self.current_open_frames = 0
         else:
-            self.current_open_frames += 1
-            # eye opened back up; decide if prior closed run was a blink
             if self.prev_is_blinking:
-                long_enough = self.current_blink_frames >= 3
-                cooldown_ok = (now_ts - self.last_blink_time) > 1.0
-                reopened = self.current_open_frames >= 2
-                if long_enough and cooldown_ok and reopened:
+                self.last_closed_frames = self.current_blink_frames
+            self.current_blink_frames = 0
+            self.current_open_frames += 1
+            # eye has stayed open long enough; decide if prior closed run was a blink
+            if self.current_open_frames == self.BLINK_REOPEN_FRAMES:
+                long_enough = self.last_closed_frames >= self.BLINK_MIN_FRAMES
+                cooldown_ok = (now_ts - self.last_blink_time) > self.BLINK_COOLDOWN
+                if long_enough and cooldown_ok:
                     if self.blink_counter == 0:
                         self.blink_start_time = now_ts
                     self.blink_counter += 1
                     self.last_blink_time = now_ts
-            self.current_blink_frames = 0
+                self.last_closed_frames = 0
 
         # update state for next frame
         self.prev_is_blinking = is_blinking
@@ -183,7 +312,7 @@ class IrisGazeTracker:
         if self.blink_start_time is None:
             return 0
 
-        elapsed_seconds = time.time() - self.blink_start_time
+        elapsed_seconds = self.clock() - self.blink_start_time
         # Avoid inflated rates in the first few seconds; require at least 60s window
         if elapsed_seconds < 60:
             return 0
@@ -195,82 +324,60 @@ class IrisGazeTracker:
     
     def get_iris_diameter(self, landmarks, frame_shape) -> Optional[float]:
         """
-        estimate iris diameter for pupil dilation detection
+        iris diameter in pixels from a circle fit of the iris ring landmarks
         can indicate eye strain or fatigue
         """
-        iris_pos = self.get_iris_position(landmarks, frame_shape)
-        if not iris_pos:
+        if not landmarks or self.geometry.iris_radii is None:
             return None
-            
-        # This is a simplified estimation
-        # In reality, you'd need additional iris boundary landmarks
-        h, w = frame_shape[:2]
-        
-        # rough estimation based on eye size
-        left_inner = landmarks[self.LEFT_EYE_CORNERS[0]]
-        left_outer = landmarks[self.LEFT_EYE_CORNERS[1]]
-        eye_width = abs((left_outer.x - left_inner.x) * w)
-        
-        # iris is typically ~25% of eye width
-        estimated_iris_diameter = eye_width * 0.25
-        return estimated_iris_diameter
+        return self.geometry.iris_diameter()
     
-    def get_gaze_analysis(self, landmarks, frame_shape) -> dict:
+    def get_gaze_analysis(self, landmarks, frame_shape, blendshapes=None) -> GazeAnalysis:
         """
         Comprehensive gaze analysis including all metrics
+        Fills and returns this tracker's reused GazeAnalysis record, so the
+        result is only valid until the next call
         """
-        gaze_direction = self.calculate_gaze_direction(landmarks, frame_shape)
-        is_blinking = self.detect_blink(landmarks, frame_shape)
-        blink_rate = self.get_blink_rate()
-        iris_diameter = self.get_iris_diameter(landmarks, frame_shape)
-        iris_pos = self.get_iris_position(landmarks, frame_shape)
-        too_close = self.is_too_close(landmarks, frame_shape)
-        
-        return {
-            'gaze_direction': gaze_direction,
-            'is_blinking': is_blinking,
-            'blink_rate': blink_rate,
-            'iris_diameter': iris_diameter,
-            'iris_positions': iris_pos,
-            'too_close': too_close,
-            'timestamp': time.time()
-        }
+        if landmarks:
+            self.geometry.update(landmarks, frame_shape)
+        
+        analysis = self.analysis
+        analysis.gaze_direction = self.calculate_gaze_direction(landmarks, frame_shape)
+        analysis.is_blinking = self.detect_blink(landmarks, frame_shape, blendshapes)
+        analysis.blink_rate = self.get_blink_rate()
+        analysis.iris_diameter = self.get_iris_diameter(landmarks, frame_shape)
+        analysis.iris_positions = self.get_iris_position(landmarks, frame_shape)
+        analysis.too_close = self.is_too_close(landmarks, frame_shape)
+        analysis.distance_cm = self.get_distance_cm()
+        analysis.gaze_features = self.get_gaze_features(landmarks, frame_shape)
+        analysis.screen_point = self.calibration.map(analysis.gaze_features) if self.calibration else None
+        analysis.timestamp = self.clock()
+        return analysis
     
     def is_too_close(self, landmarks, frame_shape) -> bool:
         """
-        Detect if user is too close to screen based on face size
-        Uses face width relative to a calibrated baseline
+        Detect if user is too close to screen based on iris size
+        Iris diameter is nearly constant between people, so its apparent size
+        (corrected for head pose) gives distance; compared to a slowly adapting
+        median baseline
         """
         if not landmarks:
             return False
         
         h, w = frame_shape[:2]
-        
-        # Get face width using outer eye corners (more stable than face edges)
-        left_outer = landmarks[33]   # Left eye outer corner
-        right_outer = landmarks[263] # Right eye outer corner
-        
-        face_width = abs(right_outer.x - left_outer.x) * w
-        
-        # Calibrate baseline from first few frames
-        if len(self.face_width_samples) < 30:  # ~1 second of samples
-            self.face_width_samples.append(face_width)
-            if len(self.face_width_samples) == 30:
-                # Use median to avoid outliers
-                self.baseline_face_width = sorted(self.face_width_samples)[15]
-            return False
-        
-        if self.baseline_face_width is None:
-            return False
-        
-        # Check if face is significantly larger than baseline
-        ratio = face_width / self.baseline_face_width
-        return ratio > self.TOO_CLOSE_THRESHOLD
+        g = self.geometry
+        self.distance.update(g.iris_diameter(), w, yaw=g.yaw, pitch=g.pitch, now=self.clock())
+        return self.distance.too_close
+    
+    def get_distance_cm(self) -> Optional[float]:
+        """latest smoothed viewing distance estimate"""
+        if self.distance.distance_mm is None:
+            return None
+        return self.distance.distance_mm / 10
     
     def reset_distance_calibration(self):
         """Reset the distance baseline (if user changes position)"""
-        self.baseline_face_width = None
-        self.face_width_samples = []
+        self.distance.reset()
+        self.geometry.reset()
     
     def draw_debug_overlay(self, frame, landmarks, analysis: dict):
 
@@ -280,7 +387,7 @@ class IrisGazeTracker:
         h, w = frame.shape[:2]
         
         # Draw iris centers
-        if analysis['iris_positions']:
+        if analysis['iris_positions'] is not None:
             left_x, left_y, right_x, right_y = analysis['iris_positions']
             cv2.circle(frame, (int(left_x), int(left_y)), 3, (0, 255, 0), -1)
             cv2.circle(frame, (int(right_x), int(right_y)), 3, (0, 255, 0), -1)
@@ -300,7 +407,7 @@ class IrisGazeTracker:
     def reset_blink_counter(self):
         """reset blink tracking"""
         self.blink_counter = 0
-        self.blink_start_time = time.time()
+        self.blink_start_time = self.clock()
 
 
 def get_gaze_direction(landmarks, frame_shape):
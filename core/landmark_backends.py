@@ -0,0 +1,173 @@
+"""
+Landmark Backends - Interchangeable face landmark engines
+
+facemesh:   legacy mp.solutions FaceMesh, blocks for the whole inference
+landmarker: MediaPipe Tasks FaceLandmarker in LIVE_STREAM mode; frames are
+            submitted with timestamps and results arrive on a callback, so
+            inference overlaps with the rest of the frame loop
+"""
+import os
+import threading
+import time
+
+import mediapipe as mp
+
+LANDMARKER_MODEL = os.environ.get("LOOKALIVE_FACE_LANDMARKER_MODEL", "face_landmarker.task")
+
+
+class LandmarkResult:
+    __slots__ = ("landmarks", "blendshapes", "timestamp_ms")
+
+    def __init__(self, landmarks, blendshapes=None, timestamp_ms=0):
+        self.landmarks = landmarks  # indexable landmarks with .x/.y/.z, or None if no face
+        self.blendshapes = blendshapes  # {name: score} when the backend provides them
+        self.timestamp_ms = timestamp_ms
+
+
+class FaceMeshBackend:
+    name = "facemesh"
+    is_async = False
+
+    def __init__(self, face_mesh=None):
+        self.face_mesh = face_mesh or mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.8,
+            min_tracking_confidence=0.8,
+        )
+        self.record = LandmarkResult(None)  # reused every frame
+        self.fresh = False
+
+    def submit(self, rgb, timestamp_ms):
+        results = self.face_mesh.process(rgb)
+        self.record.landmarks = results.multi_face_landmarks[0].landmark if results.multi_face_landmarks else None
+        self.record.timestamp_ms = timestamp_ms
+        self.fresh = True
+
+    def poll(self):
+        """newest result not yet returned, or None"""
+        if not self.fresh:
+            return None
+        self.fresh = False
+        return self.record
+
+    def close(self):
+        self.face_mesh.close()
+
+
+class FaceLandmarkerBackend:
+    name = "landmarker"
+    is_async = True
+
+    def __init__(self, model_path=LANDMARKER_MODEL, output_blendshapes=True):
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"FaceLandmarker model not found: {model_path}")
+
+        self.lock = threading.Lock()
+        self.result = None
+        self.last_timestamp = -1
+
+        options = vision.FaceLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_faces=1,
+            min_face_detection_confidence=0.8,
+            min_tracking_confidence=0.8,
+            output_face_blendshapes=output_blendshapes,
+            result_callback=self._on_result,
+        )
+        self.landmarker = vision.FaceLandmarker.create_from_options(options)
+
+    def _on_result(self, result, image, timestamp_ms):
+        landmarks = result.face_landmarks[0] if result.face_landmarks else None
+        blendshapes = None
+        if result.face_blendshapes:
+            blendshapes = {c.category_name: c.score for c in result.face_blendshapes[0]}
+        with self.lock:
+            self.result = LandmarkResult(landmarks, blendshapes, timestamp_ms)
+
+    def submit(self, rgb, timestamp_ms):
+        # timestamps must strictly increase; the graph drops frames it can't keep up with
+        if timestamp_ms <= self.last_timestamp:
+            timestamp_ms = self.last_timestamp + 1
+        self.last_timestamp = timestamp_ms
+        self.landmarker.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb), timestamp_ms)
+
+    def poll(self):
+        with self.lock:
+            result, self.result = self.result, None
+        return result
+
+    def close(self):
+        self.landmarker.close()
+
+
+BACKENDS = {
+    FaceMeshBackend.name: FaceMeshBackend,
+    FaceLandmarkerBackend.name: FaceLandmarkerBackend,
+}
+
+
+def create_backend(name="facemesh", **kwargs):
+    """Build a backend by name, falling back to FaceMesh if it can't start."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown landmark backend '{name}' (choose from {', '.join(BACKENDS)})")
+    try:
+        return BACKENDS[name](**kwargs)
+    except (ImportError, FileNotFoundError, RuntimeError) as e:
+        if name == FaceMeshBackend.name:
+            raise
+        print(f"Landmark backend '{name}' unavailable ({e}) - using facemesh")
+        return FaceMeshBackend()
+
+
+def benchmark_backend(backend, frames, settle=0.5):
+    """
+    feed pre-converted RGB frames as a live loop would
+    returns: dict with blocking time per frame and delivered result rate
+    """
+    blocked = 0.0
+    results = 0
+    start = time.perf_counter()
+    for i, rgb in enumerate(frames):
+        t = time.perf_counter()
+        backend.submit(rgb, int((t - start) * 1000) + i)
+        blocked += time.perf_counter() - t
+        if backend.poll() is not None:
+            results += 1
+    time.sleep(settle if backend.is_async else 0)
+    if backend.poll() is not None:
+        results += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "backend": backend.name,
+        "blocking_ms": blocked / len(frames) * 1000,
+        "results": results,
+        "frames": len(frames),
+        "wall_s": elapsed,
+    }
+
+
+if __name__ == "__main__":
+    # python -m core.landmark_backends - compare both backends on live webcam frames
+    import cv2
+    from utils.webcam import get_webcam_capture
+
+    cap = get_webcam_capture()
+    frames = []
+    while len(frames) < 150:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+
+    for name in BACKENDS:
+        backend = create_backend(name)
+        stats = benchmark_backend(backend, frames)
+        backend.close()
+        print(f"{stats['backend']:>10}: {stats['blocking_ms']:.1f}ms blocked/frame, "
+              f"{stats['results']}/{stats['frames']} results in {stats['wall_s']:.1f}s")
@@ -0,0 +1,157 @@
+"""
+Metrics Server - Optional local HTTP endpoint for status, metrics and control
+"""
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# commands accepted on POST /control/<name>; main.py applies them between frames
+CONTROL_COMMANDS = ("reset_calibration", "reset_blinks", "toggle_compact", "toggle_debug", "pause", "resume")
+
+
+class LoopMetrics:
+    """Smoothed FPS and per-stage latency for the frame loop."""
+
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self.stage_ms = {}
+        self.fps = 0.0
+        self.frames = 0
+        self.last_tick = None
+
+    def record(self, stage, seconds):
+        ms = seconds * 1000
+        prev = self.stage_ms.get(stage)
+        self.stage_ms[stage] = ms if prev is None else prev + self.smoothing * (ms - prev)
+
+    def tick(self, now):
+        self.frames += 1
+        if self.last_tick is not None and now > self.last_tick:
+            fps = 1.0 / (now - self.last_tick)
+            self.fps = fps if self.fps == 0 else self.fps + self.smoothing * (fps - self.fps)
+        self.last_tick = now
+
+
+class MetricsServer:
+    def __init__(self, port, host="127.0.0.1", metrics=None):
+        self.host = host
+        self.port = port
+        self.metrics = metrics or LoopMetrics()
+        self.commands = queue.Queue(maxsize=32)
+        self.lock = threading.Lock()
+        self.status = {}
+        self.started = time.time()
+        self.httpd = None
+
+    def publish(self, status: dict):
+        """Copy in the latest status (called once per frame; the caller may reuse its dict)."""
+        with self.lock:
+            self.status.update(status)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            status = dict(self.status)
+        status["fps"] = round(self.metrics.fps, 2)
+        status["frames"] = self.metrics.frames
+        stages = dict(self.metrics.stage_ms)  # copy first, the frame loop keeps writing
+        status["stage_latency_ms"] = {k: round(v, 3) for k, v in stages.items()}
+        status["uptime_seconds"] = round(time.time() - self.started, 1)
+        return status
+
+    def prometheus(self) -> str:
+        status = self.snapshot()
+        lines = []
+
+        def gauge(name, value, help_text, labels="", kind="gauge"):
+            if value is None:
+                return
+            lines.append(f"# HELP lookalive_{name} {help_text}")
+            lines.append(f"# TYPE lookalive_{name} {kind}")
+            lines.append(f"lookalive_{name}{labels} {float(value)}")
+
+        gauge("fps", status["fps"], "Smoothed frame loop rate")
+        gauge("frames_total", status["frames"], "Frames processed since start", kind="counter")
+        gauge("uptime_seconds", status["uptime_seconds"], "Seconds since start")
+        gauge("face_present", status.get("face_present"), "1 if a face is currently detected")
+        gauge("looking_at_screen", status.get("gaze") == "center" if "gaze" in status else None,
+              "1 if the user is looking at a screen")
+        gauge("user_away", status.get("away"), "1 if the user is away from the desk")
+        gauge("paused", status.get("paused"), "1 if tracking is paused")
+        gauge("break_in_progress", status.get("break_in_progress"), "1 during a break")
+        gauge("time_to_break_seconds", status.get("time_to_break"), "Seconds until the next break")
+        gauge("blink_rate", status.get("blink_rate"), "Blinks per minute")
+        gauge("too_close", status.get("too_close"), "1 if the user is too close to the screen")
+
+        stages = status["stage_latency_ms"]
+        if stages:
+            lines.append("# HELP lookalive_stage_latency_ms Smoothed per-stage latency")
+            lines.append("# TYPE lookalive_stage_latency_ms gauge")
+            for stage, ms in stages.items():
+                lines.append(f'lookalive_stage_latency_ms{{stage="{stage}"}} {ms}')
+        return "\n".join(lines) + "\n"
+
+    def pending_commands(self):
+        """Yield queued control commands without blocking."""
+        while True:
+            try:
+                yield self.commands.get_nowait()
+            except queue.Empty:
+                return
+
+    def start(self):
+        """Serve in a daemon thread; returns False if the port is unavailable."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, code, body, content_type="application/json"):
+                data = body.encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/status":
+                    self._send(200, json.dumps(server.snapshot()))
+                elif self.path == "/metrics":
+                    self._send(200, server.prometheus(), "text/plain; version=0.0.4")
+                elif self.path == "/health":
+                    self._send(200, json.dumps({"ok": True}))
+                else:
+                    self._send(404, json.dumps({"error": "not found"}))
+
+            def do_POST(self):
+                prefix = "/control/"
+                command = self.path[len(prefix):] if self.path.startswith(prefix) else None
+                if command not in CONTROL_COMMANDS:
+                    self._send(404, json.dumps({"error": "unknown command",
+                                                "commands": list(CONTROL_COMMANDS)}))
+                    return
+                try:
+                    server.commands.put_nowait(command)
+                except queue.Full:
+                    self._send(503, json.dumps({"error": "command queue full"}))
+                    return
+                self._send(202, json.dumps({"queued": command}))
+
+            def log_message(self, format, *args):
+                pass  # keep stdout for the app
+
+        try:
+            self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            print(f"Metrics server not started: {e}")
+            return False
+
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        print(f"Metrics on http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
@@ -1,10 +1,10 @@
 from plyer import notification
 import time
 
-def notify_start_break():
+def notify_start_break(title="20-20-20 Rule", message="Look 20 feet away for 20 seconds!"):
     notification.notify(
-        title="20-20-20 Rule",
-        message="Look 20 feet away for 20 seconds!",
+        title=title,
+        message=message,
         timeout=3,
     )
 
@@ -0,0 +1,116 @@
+"""
+Presence Detector - Notice when the user leaves and cheaply watch for their return
+"""
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionDetector:
+    """Frame differencing on a tiny grayscale copy, using buffers reused every call."""
+
+    def __init__(self, size=(64, 48), pixel_threshold=25, min_changed=0.02):
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = int(size[0] * size[1] * min_changed)
+
+        w, h = size
+        self.small = None
+        self.gray = np.empty((h, w), dtype=np.uint8)
+        self.prev = np.empty((h, w), dtype=np.uint8)
+        self.diff = np.empty((h, w), dtype=np.uint8)
+        self.has_prev = False
+
+    def detect(self, frame) -> bool:
+        """True if enough of the scene changed since the last call."""
+        self.small = cv2.resize(frame, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.gray)
+
+        if not self.has_prev:
+            self.gray, self.prev = self.prev, self.gray
+            self.has_prev = True
+            return False
+
+        cv2.absdiff(self.gray, self.prev, dst=self.diff)
+        cv2.threshold(self.diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self.diff)
+        self.gray, self.prev = self.prev, self.gray
+        return cv2.countNonZero(self.diff) > self.min_changed
+
+    def reset(self):
+        self.has_prev = False
+
+
+class PresenceDetector:
+    """
+    Tracks whether the user is at the desk.
+    While away, FaceMesh is skipped: each camera is only checked every
+    `check_interval` seconds for motion, plus a forced probe every
+    `probe_interval` seconds in case the user came back sitting still.
+    """
+
+    def __init__(self, absent_after=3.0, check_interval=0.5, probe_interval=5.0, on_away_end=None):
+        self.absent_after = absent_after
+        self.check_interval = check_interval
+        self.probe_interval = probe_interval
+        self.on_away_end = on_away_end  # called with (start, end) timestamps
+
+        self.away = False
+        self.away_start = None
+        self.last_face_time = time.time()
+        self.away_probe_start = 0  # probes are timed from when the user left
+        self.last_probe = {}
+        self.last_check = {}
+        self.motion = {}
+
+    def should_analyse(self, key, frame, now) -> bool:
+        """Decide whether a camera's frame is worth running FaceMesh on."""
+        if not self.away:
+            return True
+
+        if now - self.last_check.get(key, 0) < self.check_interval:
+            return False
+        self.last_check[key] = now
+
+        motion = self.motion.get(key)
+        if motion is None:
+            motion = self.motion[key] = MotionDetector()
+        if motion.detect(frame):
+            return True
+
+        if now - self.last_probe.get(key, self.away_probe_start) >= self.probe_interval:
+            self.last_probe[key] = now
+            return True
+        return False
+
+    def update(self, face_found, now):
+        """
+        Feed this tick's detection result.
+        returns: "away" when the user just left, "back" when they returned, else None
+        """
+        if face_found:
+            self.last_face_time = now
+            if self.away:
+                self.away = False
+                self._close_away_period(now)
+                return "back"
+        elif not self.away and now - self.last_face_time >= self.absent_after:
+            self.away = True
+            self.away_start = self.last_face_time
+            self.away_probe_start = now
+            self.last_probe.clear()
+            for motion in self.motion.values():
+                motion.reset()
+            return "away"
+        return None
+
+    def finish(self, now=None):
+        """Close any open away period (call on shutdown)."""
+        if self.away:
+            self.away = False
+            self._close_away_period(now or time.time())
+
+    def _close_away_period(self, now):
+        if self.on_away_end and self.away_start is not None:
+            self.on_away_end(self.away_start, now)
+        self.away_start = None
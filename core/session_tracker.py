@@ -1,24 +1,147 @@
 """
 Session Tracker - Track usage patterns and generate heatmaps
 """
+import copy
 import json
 import os
+import queue
+import threading
 import time
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+from .single_instance import FileLock
+
+
+def write_json_atomic(path, data, fsync=False):
+    # write to a temp file then swap it in, so a crash never leaves half a file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SessionWriter:
+    """
+    Background thread that owns all session file writes.
+    Receives small deltas and, holding an OS lock on `<data_file>.lock`,
+    re-reads the file, merges them in and swaps it out atomically, so another
+    process writing the same history can't be overwritten.
+    fsync is "always", "rollover" (hour change / shutdown) or "never".
+    """
+
+    STOP = object()
+
+    def __init__(self, data_file, document, max_queue=64, fsync="rollover"):
+        self.data_file = data_file
+        self.document = copy.deepcopy(document)
+        self.fsync = fsync
+        self.lock = FileLock(data_file + ".lock")
+        self.pending = []  # deltas not yet on disk (kept if the lock can't be had)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def submit(self, hours, away, sync=False, block=False) -> bool:
+        """Queue a delta; returns False if the queue is full (caller keeps it for later)."""
+        try:
+            self.queue.put((hours, away, sync), block=block, timeout=5.0 if block else None)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self, timeout=5.0):
+        try:
+            self.queue.put(self.STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self.thread.join(timeout)
+
+    @staticmethod
+    def _merge(document, hours, away):
+        daily = document.setdefault("daily", {})
+        for (day, hour), minutes in hours.items():
+            day_data = daily.setdefault(day, {})
+            day_data[str(hour)] = day_data.get(str(hour), 0) + minutes
+        for day, record in away:
+            document.setdefault("away", {}).setdefault(day, []).append(record)
+
+    def _read_document(self):
+        # the file is the source of truth; fall back to our copy if it's missing or unreadable
+        try:
+            with open(self.data_file, 'r') as f:
+                return json.load(f)
+        except:
+            return copy.deepcopy(self.document)
+
+    def _write(self, sync):
+        with self.lock:
+            document = self._read_document()
+            for hours, away in self.pending:
+                self._merge(document, hours, away)
+            write_json_atomic(self.data_file, document, fsync=sync)
+        self.document = document
+        self.pending.clear()
+
+    def _run(self):
+        while True:
+            items = [self.queue.get()]
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            sync = self.fsync == "always"
+            for item in items:
+                if item is self.STOP:
+                    stop = True
+                    continue
+                hours, away, item_sync = item
+                self.pending.append((hours, away))
+                sync = sync or (item_sync and self.fsync == "rollover")
+
+            try:
+                self._write(sync)
+            except Exception as e:
+                print(f"Error saving session data: {e}")
+
+            if stop:
+                return
+
 
 class SessionTracker:
-    def __init__(self, data_file="session_data.json"):
+    def __init__(self, data_file="session_data.json", flush_interval=60.0, fsync="rollover", max_gap=5.0,
+                 start_time=None):
         self.data_file = data_file
-        self.session_start = time.time()
-        self.hourly_data = defaultdict(float)  # hour is key, value is minutes at screen
-        self.current_hour = datetime.now().hour
-        self.last_update = time.time()
+        self.flush_interval = flush_interval
+        self.max_gap = max_gap  # longer gaps between updates aren't counted as screen time
+        # start_time lets recorded sessions run on their own timestamps
+        self.session_start = time.time() if start_time is None else start_time
+        self.last_update = self.session_start
+        self.session_away_minutes = 0.0
+        self.revision = 0  # bumped whenever the hourly rollups change
         
         # load any previous data if it exists
         self.all_data = self.load_data()
         
+        # file writes happen on a background thread, never in the frame loop
+        self.writer = SessionWriter(data_file, self.all_data, fsync=fsync)
+        self.writer.start()
+        self.unsent_hours = defaultdict(float)  # (day, hour) -> minutes not yet handed to the writer
+        self.unsent_away = []
+        
+        # current hour bucket; update() only compares against next_boundary
+        self._start_bucket(self.last_update)
+        self.next_flush = self.last_update + flush_interval
+        self.next_boundary = min(self.hour_end, self.next_flush)
+        
     def load_data(self) -> dict:
         # load session data from file if it exists
         if os.path.exists(self.data_file):
@@ -30,60 +153,97 @@ class SessionTracker:
         return {"daily": {}, "weekly_summary": {}}
     
     def save_data(self):
-        # save session data to file
-        try:
-            with open(self.data_file, 'w') as f:
-                json.dump(self.all_data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving session data: {e}")
+        # hand everything accumulated so far to the writer (non-blocking)
+        self._flush_bucket()
+        self._send(sync=True)
+    
+    def _start_bucket(self, now):
+        # bucket by the local date and hour the time was spent in, so 23:00
+        # stays on the right day and DST shifts land on real hour starts
+        local = datetime.fromtimestamp(now)
+        self.current_day = local.strftime("%Y-%m-%d")
+        self.current_hour = local.hour
+        self.current_minutes = 0.0
+        hour_start = local.replace(minute=0, second=0, microsecond=0)
+        self.hour_end = (hour_start + timedelta(hours=1)).timestamp()
+        if self.hour_end <= now:
+            self.hour_end = now + 1
     
-    def update(self, is_looking_at_screen: bool):
-        # update tracking with current state
-        now = time.time()
-        current_hour = datetime.now().hour
+    def update(self, is_looking_at_screen: bool, now=None):
+        # update tracking with current state - one compare and one add per frame
+        if now is None:
+            now = time.time()
         
-        # if hour changed, save previous hour data
-        if current_hour != self.current_hour:
-            self._save_hourly_data()
-            self.current_hour = current_hour
+        if now >= self.next_boundary:
+            self._checkpoint(now, is_looking_at_screen)
         
-        # add minutes to current hour if user is looking at screen
-        if is_looking_at_screen:
-            elapsed = (now - self.last_update) / 60  # minutes
-            self.hourly_data[current_hour] += elapsed
+        elapsed = now - self.last_update
+        if is_looking_at_screen and elapsed <= self.max_gap:
+            self.current_minutes += elapsed / 60
         
         self.last_update = now
     
-    def _save_hourly_data(self):
-        # save hourly data to the daily record
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        if today not in self.all_data["daily"]:
-            self.all_data["daily"][today] = {}
+    def _checkpoint(self, now, is_looking_at_screen):
+        rollover = now >= self.hour_end
+        if rollover and now - self.last_update <= self.max_gap:
+            # credit the slice of this frame that fell before the boundary
+            if is_looking_at_screen:
+                self.current_minutes += (self.hour_end - self.last_update) / 60
+            self.last_update = self.hour_end
         
-        for hour, minutes in self.hourly_data.items():
-            hour_key = str(hour)
-            if hour_key in self.all_data["daily"][today]:
-                self.all_data["daily"][today][hour_key] += minutes
-            else:
-                self.all_data["daily"][today][hour_key] = minutes
+        self._flush_bucket()
+        if rollover:
+            self._start_bucket(now)
+        self._send(sync=rollover)
         
-        self.hourly_data.clear()
-        self.save_data()
+        self.next_flush = now + self.flush_interval
+        self.next_boundary = min(self.hour_end, self.next_flush)
+    
+    def _flush_bucket(self):
+        # move the current bucket into the in-memory history and the unsent delta
+        if self.current_minutes <= 0:
+            return
+        day_data = self.all_data.setdefault("daily", {}).setdefault(self.current_day, {})
+        hour_key = str(self.current_hour)
+        day_data[hour_key] = day_data.get(hour_key, 0) + self.current_minutes
+        self.unsent_hours[(self.current_day, self.current_hour)] += self.current_minutes
+        self.current_minutes = 0.0
+        self.revision += 1
+    
+    def _send(self, sync=False, block=False):
+        if not self.unsent_hours and not self.unsent_away and not sync:
+            return
+        if self.writer.submit(dict(self.unsent_hours), list(self.unsent_away), sync, block):
+            self.unsent_hours.clear()
+            self.unsent_away.clear()
+    
+    def record_away(self, start: float, end: float):
+        # log a period the user spent away from the desk
+        minutes = (end - start) / 60
+        started = datetime.fromtimestamp(start)
+        day = started.strftime("%Y-%m-%d")
+        record = {
+            "start": started.strftime("%H:%M:%S"),
+            "minutes": round(minutes, 2),
+        }
+        self.all_data.setdefault("away", {}).setdefault(day, []).append(record)
+        self.unsent_away.append((day, record))
+        self.session_away_minutes += minutes
     
     def get_today_heatmap(self) -> dict:
         # get hourly breakdown for today
         today = datetime.now().strftime("%Y-%m-%d")
         saved_data = self.all_data["daily"].get(today, {})
         
-        # merge with current session data
+        # merge with the hour still being accumulated
         result = {str(h): 0 for h in range(24)}
         
         for hour, minutes in saved_data.items():
             result[hour] = minutes
         
-        for hour, minutes in self.hourly_data.items():
-            result[str(hour)] = result.get(str(hour), 0) + minutes
+        if self.current_day == today:
+            hour_key = str(self.current_hour)
+            result[hour_key] = result.get(hour_key, 0) + self.current_minutes
         
         return result
     
@@ -100,13 +260,21 @@ class SessionTracker:
         
         return result
     
+    def close(self):
+        # hand over everything pending and stop the writer
+        self._flush_bucket()
+        self._send(sync=True, block=True)
+        self.writer.close()
+    
     def end_session(self):
         # call this when the app closes
-        self._save_hourly_data()
+        self.close()
         
         # show session duration
         session_duration = (time.time() - self.session_start) / 60
         print(f"\nSession Duration: {session_duration:.1f} minutes")
+        if self.session_away_minutes > 0:
+            print(f"Time away from desk: {self.session_away_minutes:.1f} minutes")
         
         # show today's summary
         today_data = self.get_today_heatmap()
@@ -0,0 +1,152 @@
+"""
+Single Instance - OS file locks, and a local channel so a second launch
+hands its request to the running LookAlive instead of starting another camera pipeline
+"""
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+# commands a second launch can send to the running instance
+INSTANCE_COMMANDS = ("show", "summary")
+
+STATE_DIR = os.path.join(os.path.expanduser("~"), ".lookalive")
+
+
+class FileLock:
+    """
+    Exclusive OS lock on a sidecar file. The OS drops it when the process
+    dies, so a crash never leaves a stale lock behind.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+
+    def acquire(self, blocking=True, timeout=10.0) -> bool:
+        if self.handle:
+            return True
+        handle = open(self.path, 'a+')
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if os.name == "nt":
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self.handle = handle
+                return True
+            except OSError:
+                if not blocking or time.monotonic() >= deadline:
+                    handle.close()
+                    return False
+                time.sleep(0.05)
+
+    def release(self):
+        if not self.handle:
+            return
+        try:
+            if os.name == "nt":
+                self.handle.seek(0)
+                msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        finally:
+            self.handle.close()
+            self.handle = None
+
+    def __enter__(self):
+        if not self.acquire():
+            raise TimeoutError(f"Timed out waiting for lock {self.path}")
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class SingleInstance:
+    """
+    The first instance holds `<name>.lock` for its lifetime and listens on an
+    ephemeral localhost port (published in `<name>.port`). Later launches fail
+    to take the lock and send their command over that port instead.
+    """
+
+    def __init__(self, name="lookalive", directory=STATE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.lock = FileLock(os.path.join(directory, f"{name}.lock"))
+        self.port_file = os.path.join(directory, f"{name}.port")
+        self.commands = queue.Queue(maxsize=32)
+        self.server = None
+
+    def acquire(self) -> bool:
+        """Become the running instance; returns False if another one holds the lock."""
+        if not self.lock.acquire(blocking=False):
+            return False
+
+        instance = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                command = self.rfile.readline(64).decode("utf-8", "ignore").strip()
+                if command not in INSTANCE_COMMANDS:
+                    self.wfile.write(b"unknown\n")
+                    return
+                try:
+                    instance.commands.put_nowait(command)
+                    self.wfile.write(b"ok\n")
+                except queue.Full:
+                    self.wfile.write(b"busy\n")
+
+        try:
+            self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        except OSError as e:
+            print(f"Instance channel not started: {e}")
+            return True  # still the only instance, just not reachable
+
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        try:
+            with open(self.port_file, 'w') as f:
+                json.dump({"port": self.server.server_address[1], "pid": os.getpid()}, f)
+        except Exception as e:
+            print(f"Error publishing instance port: {e}")
+        return True
+
+    def signal(self, command="show", timeout=2.0) -> bool:
+        """Send a command to the running instance; True once it has queued it."""
+        try:
+            with open(self.port_file, 'r') as f:
+                port = json.load(f)["port"]
+            with socket.create_connection(("127.0.0.1", port), timeout=timeout) as conn:
+                conn.sendall(f"{command}\n".encode("utf-8"))
+                return conn.makefile('rb').readline().strip() == b"ok"
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def pending_commands(self):
+        """Yield commands from other launches without blocking."""
+        while True:
+            try:
+                yield self.commands.get_nowait()
+            except queue.Empty:
+                return
+
+    def release(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            try:
+                os.remove(self.port_file)
+            except OSError:
+                pass
+        self.lock.release()
@@ -0,0 +1,547 @@
+"""
+Threshold Sweep - Evaluate grids of gaze, blink and distance thresholds on recorded landmark sequences
+
+usage: python -m core.threshold_sweep SEQUENCES... [-j WORKERS] [-o lookalive_tuning.json]
+
+Sequences are .npz files written by SequenceRecorder (python -m core.batch_analyzer --save-landmarks).
+Ground truth is optional and lives next to each sequence as <name>.labels.json,
+with times in seconds from the start of the recording:
+
+    {"gaze": [[0, 12.5, "center"], [12.5, 14, "left"]],
+     "blinks": [3.2, 7.9, 11.4],
+     "too_close": [[40, 55, true], [55, 90, false]]}
+
+Per-frame features are computed once per sequence with whole-array ops; every
+threshold combination is then scored against them at once. The three groups
+don't interact, so each is swept over its own grid. Export the best values
+and the app picks them up from LOOKALIVE_TUNING (default lookalive_tuning.json).
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .distance_estimator import IRIS_DIAMETER_MM
+from .face_geometry import IRIS_RINGS, fit_circle_radii
+from .iris_tracker import IrisGazeTracker
+
+# landmarks the sweep needs; recordings keep only these columns
+SEQUENCE_LANDMARKS = (33, 133, 145, 159, 263, 362, 374, 386, 468, 469, 470, 471, 472, 473, 474, 475, 476, 477)
+
+GAZE_CODES = {"left": 0, "center": 1, "right": 2, "away": 3}
+
+# mirrors IrisGazeTracker / DistanceEstimator defaults
+GAZE_YAW_GAIN = 0.5
+DISTANCE_SMOOTHING = 0.3
+BASELINE_WARMUP = 30
+BASELINE_RATE = 0.0001  # per second
+BASELINE_MAX_DT = 1.0
+
+DEFAULT_GRID = {
+    "gaze_threshold": [round(float(x), 3) for x in np.arange(0.05, 0.301, 0.025)],
+    "blink_threshold": [round(float(x), 3) for x in np.arange(0.10, 0.301, 0.02)],
+    "blink_min_frames": [1, 2, 3, 4, 5],
+    "blink_cooldown": [0.3, 0.5, 1.0],
+    "blink_reopen_frames": [1, 2],
+    "too_close_ratio": [1.1, 1.2, 1.3, 1.4, 1.5, 1.6],
+}
+
+BLINK_MATCH_TOLERANCE = 0.5  # seconds between a detected and a labelled blink
+
+
+class SequenceRecorder:
+    """
+    Collects the landmarks a sweep needs, one row per analysed frame.
+    Rows go straight into float32 arrays that double in capacity when full.
+    """
+
+    def __init__(self, capacity=1024):
+        self.count = 0
+        self.frame_shape = None
+        self.timestamps = np.empty(capacity, dtype=np.float64)
+        self.points = np.empty((capacity, len(SEQUENCE_LANDMARKS), 3), dtype=np.float32)
+        self.yaw = np.empty(capacity, dtype=np.float32)
+        self.pitch = np.empty(capacity, dtype=np.float32)
+
+    def _grow(self):
+        for name in ("timestamps", "points", "yaw", "pitch"):
+            old = getattr(self, name)
+            new = np.empty((2 * len(old),) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, timestamp, landmarks, frame_shape, yaw=0.0, pitch=0.0):
+        if self.count == len(self.timestamps):
+            self._grow()
+        i = self.count
+        self.frame_shape = frame_shape[:2]
+        self.timestamps[i] = timestamp
+        row = self.points[i]
+        if landmarks:
+            for j, lid in enumerate(SEQUENCE_LANDMARKS):
+                lm = landmarks[lid]
+                row[j, 0] = lm.x
+                row[j, 1] = lm.y
+                row[j, 2] = lm.z
+        else:
+            row.fill(np.nan)
+        self.yaw[i] = yaw
+        self.pitch[i] = pitch
+        self.count += 1
+
+    def save(self, path):
+        n = self.count
+        np.savez_compressed(
+            path,
+            timestamps=self.timestamps[:n],
+            landmarks=self.points[:n],
+            landmark_ids=np.asarray(SEQUENCE_LANDMARKS),
+            frame_shape=np.asarray(self.frame_shape or (0, 0)),
+            yaw=self.yaw[:n],
+            pitch=self.pitch[:n],
+        )
+
+
+def load_labels(path, timestamps):
+    """
+    per-frame label arrays from <sequence>.labels.json
+    returns: (gaze codes or None, blink times or None, too_close flags or None); -1 = unlabelled
+    """
+    labels_path = os.path.splitext(path)[0] + ".labels.json"
+    if not os.path.exists(labels_path):
+        return None, None, None
+    with open(labels_path, 'r') as f:
+        labels = json.load(f)
+
+    t = timestamps - timestamps[0]
+
+    def intervals(spans, encode):
+        out = np.full(len(t), -1, dtype=np.int8)
+        for start, end, value in spans:
+            out[np.searchsorted(t, start):np.searchsorted(t, end)] = encode(value)
+        return out
+
+    gaze = intervals(labels["gaze"], GAZE_CODES.__getitem__) if "gaze" in labels else None
+    blinks = np.sort(np.asarray(labels["blinks"], dtype=np.float64)) if "blinks" in labels else None
+    too_close = intervals(labels["too_close"], int) if "too_close" in labels else None
+    return gaze, blinks, too_close
+
+
+def extract_features(data):
+    """
+    Whole-sequence versions of the tracker's per-frame measurements.
+    returns: dict of (n,) arrays - face, gaze ratio, EAR, distance (NaN without a face)
+    """
+    points = data["landmarks"].astype(np.float64)
+    column = {lid: i for i, lid in enumerate(data["landmark_ids"].tolist())}
+    h, w = data["frame_shape"][:2]
+    n = len(points)
+
+    def px(lid):
+        return points[:, column[lid], 0] * w, points[:, column[lid], 1] * h
+
+    face = ~np.isnan(points[:, column[468], 0])
+
+    # gaze ratio, as calculate_gaze_direction
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = []
+        for iris_lid, (inner_lid, outer_lid) in ((468, (33, 133)), (473, (362, 263))):
+            iris_x, _ = px(iris_lid)
+            inner_x, _ = px(inner_lid)
+            outer_x, _ = px(outer_lid)
+            width = np.abs(outer_x - inner_x)
+            ratios.append(np.where(width > 0, (iris_x - inner_x) / width, np.nan))
+        gaze_ratio = (ratios[0] + ratios[1]) / 2 + data["yaw"] * GAZE_YAW_GAIN
+        gaze_ratio = np.where(np.isnan(gaze_ratio), 0.5, gaze_ratio)  # zero-width eye falls back to center
+
+        # eye aspect ratio, as detect_blink
+        ears = []
+        for top, bottom, inner, outer in ((159, 145, 133, 33), (386, 374, 362, 263)):
+            vertical = np.abs(px(top)[1] - px(bottom)[1])
+            horizontal = np.abs(px(outer)[0] - px(inner)[0])
+            ears.append(np.where(horizontal > 0, vertical / horizontal, np.nan))
+        ear = (ears[0] + ears[1]) / 2
+
+    # iris diameter from both ring fits in one batched solve, then pose-corrected distance
+    distance = np.full(n, np.nan)
+    if face.any():
+        rings = np.stack([np.stack(px(lid), axis=-1) for ring in IRIS_RINGS for lid in ring], axis=1)
+        rings = rings[face].reshape(-1, 4, 2)  # (frames * eyes, ring points, xy)
+        diameter = fit_circle_radii(rings).reshape(-1, 2).mean(axis=1) * 2
+        yaw, pitch = data["yaw"][face], data["pitch"][face]
+        diameter = diameter * 2 / (np.maximum(np.cos(yaw), 0.5) + np.maximum(np.cos(pitch), 0.5))
+        with np.errstate(divide="ignore"):
+            distance[face] = np.where(diameter > 0, w * IRIS_DIAMETER_MM / diameter, np.nan)
+
+    return {"face": face, "gaze_ratio": gaze_ratio, "ear": ear, "distance": distance}
+
+
+def sweep_gaze(features, labels, thresholds):
+    """(thresholds, frames) predictions in one broadcast; returns per-threshold counts"""
+    t = np.asarray(thresholds)[:, None]
+    ratio = features["gaze_ratio"][None, :]
+    pred = np.where(ratio < 0.5 - t, 0, np.where(ratio > 0.5 + t, 2, 1))
+    pred[:, ~features["face"]] = GAZE_CODES["away"]
+
+    counts = {"center_frames": (pred == 1).sum(axis=1)}
+    if labels is not None:
+        labelled = labels >= 0
+        hits = pred[:, labelled] == labels[labelled]
+        screen_hits = (pred[:, labelled] == 1) == (labels[labelled] == 1)
+        counts.update(labelled=np.full(len(thresholds), labelled.sum()),
+                      correct=hits.sum(axis=1), screen_correct=screen_hits.sum(axis=1))
+    return counts
+
+
+def _nearest_within(times, targets, tol):
+    """for each time, whether some target lies within tol"""
+    if len(times) == 0 or len(targets) == 0:
+        return np.zeros(len(times), dtype=bool)
+    idx = np.searchsorted(targets, times)
+    before = np.abs(times - targets[np.maximum(idx - 1, 0)])
+    after = np.abs(targets[np.minimum(idx, len(targets) - 1)] - times)
+    return np.minimum(before, after) <= tol
+
+
+def _next_after_cooldown(times, cooldowns):
+    """(cooldowns, n) index of the first later time with times[j] - times[i] > cooldown, else n"""
+    cooldowns = np.asarray(cooldowns, dtype=np.float64)[:, None]
+    n = len(times)
+    nxt = np.searchsorted(times, times[None, :] + cooldowns, side="right")
+    # searchsorted compares against times + cooldown; nudge by one where rounding
+    # disagrees with the tracker's own (now - last) > cooldown test
+    padded = np.append(times, np.inf)
+    nxt += (nxt < n) & (padded[nxt] - times <= cooldowns)
+    prev = np.maximum(nxt - 1, 0)
+    nxt -= (prev > np.arange(n)) & (padded[prev] - times > cooldowns)
+    return nxt
+
+
+def sweep_blinks(features, timestamps, truth, grid):
+    """
+    Closed/open runs for every EAR threshold at once, then the frame-count
+    and reopen rules per combination on the (few) candidate blinks. The
+    cooldown rule is one pass over those candidates for all cooldowns, and
+    matching against the labels is done once per candidate set.
+    """
+    # frames without a face never reach the blink counter
+    face = features["face"] & ~np.isnan(features["ear"])
+    ear = features["ear"][face]
+    t = timestamps[face]
+    n = len(ear)
+
+    thresholds = np.asarray(grid["blink_threshold"])
+    closed = ear[None, :] < thresholds[:, None]
+    padded = np.zeros((len(thresholds), n + 2), dtype=np.int8)
+    padded[:, 1:-1] = closed
+    edges = np.diff(padded, axis=1)
+
+    cooldowns = grid["blink_cooldown"]
+    combos, counts = [], {"detected": [], "tp_detected": [], "truth": [], "tp_truth": []}
+    for a, threshold in enumerate(thresholds):
+        starts = np.flatnonzero(edges[a] == 1)   # first closed frame of each run
+        ends = np.flatnonzero(edges[a] == -1)    # first open frame after it
+        closed_len = ends - starts
+        next_start = np.append(starts[1:], n)
+        open_len = next_start - ends
+
+        for reopen in grid["blink_reopen_frames"]:
+            for min_frames in grid["blink_min_frames"]:
+                ok = (closed_len >= min_frames) & (open_len >= reopen)
+                event_times = t[ends[ok] + reopen - 1]
+
+                # greedy cooldown, as _count_blink: after counting event i, the next one
+                # counted under cooldown c is nxt[c, i], so only counted events are visited
+                nxt = _next_after_cooldown(event_times, cooldowns)
+                m = len(event_times)
+                keep = np.zeros((len(cooldowns), m), dtype=bool)
+                for c in range(len(cooldowns)):
+                    jumps, kept, i = nxt[c].tolist(), [], 0
+                    while i < m:
+                        kept.append(i)
+                        i = jumps[i]
+                    keep[c, kept] = True
+
+                combos.extend((float(threshold), min_frames, cooldown, reopen) for cooldown in cooldowns)
+                counts["detected"].extend(keep.sum(axis=1).tolist())
+                if truth is not None:
+                    # a kept event is a hit if a label is near; a label is found if any
+                    # kept event falls in its window (prefix sums over each window)
+                    hit = _nearest_within(event_times, truth, BLINK_MATCH_TOLERANCE)
+                    lo = np.searchsorted(event_times, truth - BLINK_MATCH_TOLERANCE, side="left")
+                    hi = np.searchsorted(event_times, truth + BLINK_MATCH_TOLERANCE, side="right")
+                    kept_before = np.zeros((len(cooldowns), m + 1), dtype=np.int64)
+                    np.cumsum(keep, axis=1, out=kept_before[:, 1:])
+                    counts["tp_detected"].extend((keep & hit).sum(axis=1).tolist())
+                    counts["truth"].extend([len(truth)] * len(cooldowns))
+                    counts["tp_truth"].extend((kept_before[:, hi] > kept_before[:, lo]).sum(axis=1).tolist())
+    if truth is None:
+        counts = {"detected": counts["detected"]}
+    else:
+        counts["labelled_detected"] = counts["detected"]  # precision only counts labelled sequences
+    return combos, {k: np.asarray(v) for k, v in counts.items()}
+
+
+def sweep_distance(features, labels, ratios, timestamps):
+    """
+    Baseline tracking is sequential, and freezing it while too close makes
+    it depend on the ratio - so one pass over frames updates all ratios' baselines as a vector.
+    """
+    ratios = np.asarray(ratios, dtype=np.float64)
+    k = len(ratios)
+    distance = features["distance"]
+    valid = np.flatnonzero(~np.isnan(distance))
+    too_close = np.zeros((k, len(distance)), dtype=bool)
+
+    # smoothing and warm-up don't depend on the ratio - done once
+    smoothed = np.empty(len(valid))
+    value = None
+    for j, d in enumerate(distance[valid]):
+        value = d if value is None else value + DISTANCE_SMOOTHING * (d - value)
+        smoothed[j] = value
+    dts = np.minimum(np.maximum(np.diff(timestamps[valid], prepend=timestamps[valid[:1]]), 0.0), BASELINE_MAX_DT)
+
+    if len(valid) >= BASELINE_WARMUP:
+        seed = int(0.5 * (BASELINE_WARMUP - 1))
+        values = np.full(k, np.partition(smoothed[:BASELINE_WARMUP], seed)[seed])
+        for j in range(BASELINE_WARMUP, len(valid)):
+            d = smoothed[j]
+            close = values / d > ratios
+            too_close[:, valid[j]] = close
+
+            step = values * (BASELINE_RATE * dts[j])
+            up = ~close & (d > values)
+            down = ~close & (d < values)
+            values[up] = np.minimum(d, values[up] + step[up])
+            values[down] = np.maximum(d, values[down] - step[down])
+
+    result = {"too_close_frames": too_close.sum(axis=1)}
+    if labels is not None:
+        labelled = labels >= 0
+        result.update(labelled=np.full(k, labelled.sum()),
+                      correct=(too_close[:, labelled] == (labels[labelled] == 1)).sum(axis=1))
+    return result
+
+
+def evaluate_sequence(path, grid):
+    """Score every grid combination on one sequence; returns counts and timings."""
+    with np.load(path) as f:
+        data = {key: f[key] for key in f.files}
+    timestamps = data["timestamps"]
+    for key in ("yaw", "pitch"):
+        data.setdefault(key, np.zeros(len(timestamps)))
+    gaze_labels, blink_truth, close_labels = load_labels(path, timestamps)
+
+    started = time.perf_counter()
+    features = extract_features(data)
+    timings = {"features": time.perf_counter() - started}
+
+    t = time.perf_counter()
+    gaze = sweep_gaze(features, gaze_labels, grid["gaze_threshold"])
+    timings["gaze"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    blink_combos, blinks = sweep_blinks(features, timestamps, blink_truth, grid)
+    timings["blink"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    distance = sweep_distance(features, close_labels, grid["too_close_ratio"], timestamps)
+    timings["distance"] = time.perf_counter() - t
+
+    return {
+        "file": path,
+        "frames": len(timestamps),
+        "face_frames": int(features["face"].sum()),
+        "duration_s": float(timestamps[-1] - timestamps[0]) if len(timestamps) else 0.0,
+        "gaze": gaze,
+        "blink_combos": blink_combos,
+        "blink": blinks,
+        "distance": distance,
+        "timings": timings,
+    }
+
+
+def _sum(results, group, key):
+    arrays = [r[group][key] for r in results if key in r[group]]
+    return np.sum(arrays, axis=0) if arrays else None
+
+
+def _ratio(num, den):
+    return np.where(den > 0, num / np.maximum(den, 1), np.nan)
+
+
+def summarise(results, grid):
+    """
+    Aggregate counts over all sequences into per-configuration metrics.
+    runtime_us is the sweep time per configuration per sequence, amortised over its group.
+    """
+    sequences = max(len(results), 1)
+    timing = {k: sum(r["timings"][k] for r in results) for k in ("features", "gaze", "blink", "distance")}
+    frames = sum(r["face_frames"] for r in results)
+
+    gaze_rows = []
+    correct, labelled = _sum(results, "gaze", "correct"), _sum(results, "gaze", "labelled")
+    screen_correct = _sum(results, "gaze", "screen_correct")
+    center = _sum(results, "gaze", "center_frames")
+    accuracy = _ratio(correct, labelled) if correct is not None else None
+    screen_accuracy = _ratio(screen_correct, labelled) if correct is not None else None
+    for i, threshold in enumerate(grid["gaze_threshold"]):
+        gaze_rows.append({
+            "gaze_threshold": threshold,
+            "accuracy": None if accuracy is None else _clean(accuracy[i]),
+            "screen_accuracy": None if accuracy is None else _clean(screen_accuracy[i]),
+            "center_fraction": _clean(center[i] / frames) if frames else None,
+            "runtime_us": timing["gaze"] / sequences / len(grid["gaze_threshold"]) * 1e6,
+        })
+
+    blink_rows = []
+    combos = results[0]["blink_combos"] if results else []
+    detected = _sum(results, "blink", "detected")
+    tp_detected, tp_truth = _sum(results, "blink", "tp_detected"), _sum(results, "blink", "tp_truth")
+    truth = _sum(results, "blink", "truth")
+    labelled_detected = _sum(results, "blink", "labelled_detected")
+    minutes = sum(r["duration_s"] for r in results) / 60
+    for i, (threshold, min_frames, cooldown, reopen) in enumerate(combos):
+        precision = recall = f1 = None
+        if truth is not None:
+            precision = _clean(_ratio(tp_detected[i], labelled_detected[i]))
+            recall = _clean(_ratio(tp_truth[i], truth[i]))
+            if precision is not None and recall is not None and precision + recall > 0:
+                f1 = 2 * precision * recall / (precision + recall)
+        blink_rows.append({
+            "blink_threshold": threshold, "blink_min_frames": min_frames,
+            "blink_cooldown": cooldown, "blink_reopen_frames": reopen,
+            "precision": precision, "recall": recall, "f1": f1,
+            "blinks_per_min": _clean(detected[i] / minutes) if minutes else None,
+            "runtime_us": timing["blink"] / sequences / max(len(combos), 1) * 1e6,
+        })
+
+    distance_rows = []
+    correct, labelled = _sum(results, "distance", "correct"), _sum(results, "distance", "labelled")
+    close_frames = _sum(results, "distance", "too_close_frames")
+    accuracy = _ratio(correct, labelled) if correct is not None else None
+    for i, ratio in enumerate(grid["too_close_ratio"]):
+        distance_rows.append({
+            "too_close_ratio": ratio,
+            "accuracy": None if accuracy is None else _clean(accuracy[i]),
+            "too_close_fraction": _clean(close_frames[i] / frames) if frames else None,
+            "runtime_us": timing["distance"] / sequences / len(grid["too_close_ratio"]) * 1e6,
+        })
+
+    return {
+        "sequences": len(results),
+        "face_frames": frames,
+        "feature_extraction_s": round(timing["features"], 3),
+        "gaze": gaze_rows,
+        "blink": blink_rows,
+        "distance": distance_rows,
+    }
+
+
+def _clean(value):
+    value = float(value)
+    return None if math.isnan(value) else round(value, 4)
+
+
+def best_settings(summary):
+    """
+    Best labelled configuration per group (gaze accuracy, blink F1, too-close accuracy);
+    groups without labels keep the tracker's current defaults.
+    """
+    tracker = IrisGazeTracker()
+    settings = {
+        "gaze_threshold": tracker.GAZE_THRESHOLD,
+        "blink_threshold": tracker.BLINK_EAR_THRESHOLD,
+        "blink_min_frames": tracker.BLINK_MIN_FRAMES,
+        "blink_cooldown": tracker.BLINK_COOLDOWN,
+        "blink_reopen_frames": tracker.BLINK_REOPEN_FRAMES,
+        "too_close_ratio": tracker.TOO_CLOSE_THRESHOLD,
+    }
+    chosen = {}
+    for group, metric, keys in (("gaze", "accuracy", ("gaze_threshold",)),
+                                ("blink", "f1", ("blink_threshold", "blink_min_frames",
+                                                 "blink_cooldown", "blink_reopen_frames")),
+                                ("distance", "accuracy", ("too_close_ratio",))):
+        scored = [row for row in summary[group] if row[metric] is not None]
+        if not scored:
+            continue
+        best = max(scored, key=lambda row: row[metric])
+        settings.update({key: best[key] for key in keys})
+        chosen[group] = {metric: best[metric]}
+    return settings, chosen
+
+
+def _float_list(text):
+    return [float(x) for x in text.split(",")]
+
+
+def _int_list(text):
+    return [int(x) for x in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep LookAlive thresholds over recorded landmark sequences")
+    parser.add_argument("sequences", nargs="+", help=".npz landmark sequences or folders of them")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("-o", "--out", default="lookalive_tuning.json", help="tuning file to export")
+    parser.add_argument("--report", default="sweep_report.json", help="full per-configuration results")
+    parser.add_argument("--gaze-thresholds", type=_float_list)
+    parser.add_argument("--blink-thresholds", type=_float_list)
+    parser.add_argument("--blink-min-frames", type=_int_list)
+    parser.add_argument("--blink-cooldowns", type=_float_list)
+    parser.add_argument("--blink-reopen-frames", type=_int_list)
+    parser.add_argument("--too-close-ratios", type=_float_list)
+    args = parser.parse_args(argv)
+
+    grid = dict(DEFAULT_GRID)
+    for key, value in (("gaze_threshold", args.gaze_thresholds), ("blink_threshold", args.blink_thresholds),
+                       ("blink_min_frames", args.blink_min_frames), ("blink_cooldown", args.blink_cooldowns),
+                       ("blink_reopen_frames", args.blink_reopen_frames),
+                       ("too_close_ratio", args.too_close_ratios)):
+        if value:
+            grid[key] = value
+
+    paths = []
+    for path in args.sequences:
+        if os.path.isdir(path):
+            paths.extend(os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith(".npz"))
+        else:
+            paths.append(path)
+    if not paths:
+        print("No sequences found")
+        return 1
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(paths)))) as pool:
+        results = list(pool.map(evaluate_sequence, paths, [grid] * len(paths)))
+    elapsed = time.perf_counter() - started
+
+    summary = summarise(results, grid)
+    summary["wall_s"] = round(elapsed, 3)
+    settings, chosen = best_settings(summary)
+    summary["best"] = settings
+
+    with open(args.report, 'w') as f:
+        json.dump(summary, f, indent=2)
+    with open(args.out, 'w') as f:
+        json.dump(settings, f, indent=2)
+
+    configs = len(summary["gaze"]) + len(summary["blink"]) + len(summary["distance"])
+    print(f"{len(results)} sequences, {summary['face_frames']} face frames, "
+          f"{configs} configurations in {elapsed:.2f}s")
+    for group in ("gaze", "blink", "distance"):
+        if group in chosen:
+            metric, value = next(iter(chosen[group].items()))
+            print(f"  best {group}: {metric} {value:.3f}")
+        else:
+            print(f"  {group}: no labels - kept defaults")
+    print(f"Tuning written to {args.out} (report: {args.report})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,12 +10,24 @@ class UIOverlay:
     def __init__(self):
         self.compact_mode = False
         self.compact_height = 80
+        self.overlay_buffers = {}  # panel shape -> reused scratch buffer
         
     def draw_rounded_rect(self, frame, x, y, w, h, color, alpha=0.7, radius=10):
         """Draw a semi-transparent rounded rectangle."""
-        overlay = frame.copy()
-        
-        # Draw rounded rectangle
+        # only blend the panel's own region, using a scratch buffer kept per shape
+        fh, fw = frame.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, fw), min(y + h, fh)
+        if x1 <= x0 or y1 <= y0:
+            return frame
+        roi = frame[y0:y1, x0:x1]
+        overlay = self.overlay_buffers.get(roi.shape)
+        if overlay is None:
+            overlay = self.overlay_buffers[roi.shape] = np.empty_like(roi)
+        np.copyto(overlay, roi)
+        
+        # Draw rounded rectangle (coordinates relative to the region)
+        x, y = x - x0, y - y0
         cv2.rectangle(overlay, (x + radius, y), (x + w - radius, y + h), color, -1)
         cv2.rectangle(overlay, (x, y + radius), (x + w, y + h - radius), color, -1)
         cv2.circle(overlay, (x + radius, y + radius), radius, color, -1)
@@ -23,7 +35,7 @@ class UIOverlay:
         cv2.circle(overlay, (x + radius, y + h - radius), radius, color, -1)
         cv2.circle(overlay, (x + w - radius, y + h - radius), radius, color, -1)
         
-        cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
+        cv2.addWeighted(overlay, alpha, roi, 1 - alpha, 0, roi)
         return frame
     
     def draw_progress_bar(self, frame, x, y, width, height, progress, color_bg, color_fill):
@@ -42,13 +54,13 @@ class UIOverlay:
         return frame
     
     def draw_status_bar(self, frame, gaze, break_in_progress, time_to_break, break_remaining, 
-                        blink_rate, too_close, screen_time_mins):
+                        blink_rate, too_close, screen_time_mins, break_length=20):
         """Draw the main status bar overlay."""
         h, w = frame.shape[:2]
         
         if self.compact_mode:
             return self.draw_compact_overlay(frame, gaze, break_in_progress, time_to_break, 
-                                             break_remaining, too_close)
+                                             break_remaining, too_close, break_length)
         
         # Main status panel (top)
         panel_height = 120
@@ -82,7 +94,7 @@ class UIOverlay:
         
         if break_in_progress:
             # Break countdown bar (fills up as break progresses)
-            progress = 1 - (break_remaining / 20) if break_remaining else 1
+            progress = 1 - (break_remaining / break_length) if break_remaining else 1
             self.draw_progress_bar(frame, 30, bar_y, bar_width, 20, progress, 
                                    (60, 60, 60), (0, 200, 255))
             cv2.putText(frame, f"Break: {int(break_remaining)}s remaining", (30, bar_y + 40),
@@ -120,7 +132,7 @@ class UIOverlay:
         return frame
     
     def draw_compact_overlay(self, frame, gaze, break_in_progress, time_to_break, 
-                             break_remaining, too_close):
+                             break_remaining, too_close, break_length=20):
         """Draw minimal compact overlay."""
         h, w = frame.shape[:2]
         
@@ -152,7 +164,7 @@ class UIOverlay:
         bar_x = 150
         bar_width = w - 180
         if break_in_progress:
-            progress = 1 - (break_remaining / 20)
+            progress = 1 - (break_remaining / break_length)
         else:
             progress = 1 - (time_to_break / (20 * 60)) if time_to_break else 0
         
@@ -188,6 +200,15 @@ class UIOverlay:
         
         return frame
     
+    def draw_no_face(self, frame, message="No Face Detected"):
+        """Draw a solid notice panel - no full-frame blend, so it stays cheap while idle."""
+        h, w = frame.shape[:2]
+        cv2.rectangle(frame, (w//2 - 150, h//2 - 30), (w//2 + 150, h//2 + 30), (0, 0, 120), -1)
+        text_size = cv2.getTextSize(message, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
+        cv2.putText(frame, message, ((w - text_size[0]) // 2, h//2 + 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        return frame
+    
     def toggle_compact(self):
         """Toggle compact mode."""
         self.compact_mode = not self.compact_mode
@@ -3,33 +3,90 @@ LookAlive - 20-20-20 Eye Tracker
 Precise gaze tracking, blink detection, eye health monitoring
 """
 
-from core import BreakManager, notify_start_break, notify_end_break, notify_too_close, demo_notifications, IrisGazeTracker, UIOverlay, SessionTracker, SystemTray, TRAY_AVAILABLE
-from utils.webcam import get_webcam_capture
+from core import BreakManager, ReminderProgram, notify_start_break, notify_end_break, notify_too_close, demo_notifications, IrisGazeTracker, UIOverlay, SessionTracker, SystemTray, TRAY_AVAILABLE, CaptureManager, PresenceDetector, MetricsServer, DutyCycleMonitor, HeatmapRenderer, create_backend, GazeCalibration, CalibrationRoutine, GazeHeatmap, SingleInstance, load_tuning
 
-import mediapipe as mp
 import cv2
+import os
+import sys
 import time
 
 SCREEN_TIME_LIMIT = 60 * 20  # 30 seconds (demo mode)
 BREAK_DURATION = 20  # 20 seconds
 
-# initialize face mesh
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(
-    max_num_faces=1,
-    refine_landmarks=True,
-    min_detection_confidence=0.8,
-    min_tracking_confidence=0.8,
-)
+# break programs run side by side; looking away for less than `grace` seconds doesn't reset them
+REMINDER_PROGRAMS = [
+    ReminderProgram("20-20-20", SCREEN_TIME_LIMIT, BREAK_DURATION, grace=BREAK_DURATION,
+                    title="20-20-20 Rule", message="Look 20 feet away for 20 seconds!"),
+    ReminderProgram("stretch", 60 * 60, 60, grace=5 * 60,
+                    title="Stretch Break", message="Stand up and stretch for a minute"),
+    ReminderProgram("session-cap", 2 * 60 * 60, 10 * 60, grace=15 * 60,
+                    title="Long Session", message="2 hours at the screen - step away for 10 minutes"),
+]
 
-# camera setup
-cap = get_webcam_capture()
+# cameras to watch - add an index per monitor, or (index, priority) pairs
+CAMERAS = [0]
+CAMERA_POLICY = "round_robin"  # or "priority"
+INFERENCES_PER_TICK = 1  # caps FaceMesh runs per loop regardless of camera count
+
+# passive monitoring: open the camera only for short bursts (LOOKALIVE_SAMPLE_MODE=1)
+SAMPLE_MODE = os.environ.get("LOOKALIVE_SAMPLE_MODE") == "1"
+
+# local status/metrics/control endpoint, e.g. LOOKALIVE_METRICS_PORT=9477 (0 = off)
+METRICS_PORT = int(os.environ.get("LOOKALIVE_METRICS_PORT", "0"))
+
+# landmark engine: "facemesh" (blocking) or "landmarker" (async Tasks API, needs face_landmarker.task)
+LANDMARK_BACKEND = os.environ.get("LOOKALIVE_LANDMARK_BACKEND", "facemesh")
+
+# only one instance may own the camera; a second launch hands over and exits
+# (python main.py --summary prints the running instance's summary instead of showing it)
+instance = SingleInstance()
+if not instance.acquire():
+    command = "summary" if "--summary" in sys.argv else "show"
+    if instance.signal(command):
+        print(f"LookAlive is already running - sent '{command}' to it")
+    else:
+        print("LookAlive is already running")
+    sys.exit(0)
+
+# tuned gaze/blink/distance thresholds exported by python -m core.threshold_sweep
+TUNING_FILE = os.environ.get("LOOKALIVE_TUNING", "lookalive_tuning.json")
+TUNING = load_tuning(TUNING_FILE)
+if TUNING:
+    print(f"Loaded tuned thresholds from {TUNING_FILE}")
+
+# camera setup - each camera gets its own tracker and landmark backend
+cameras = CaptureManager(CAMERAS, policy=CAMERA_POLICY, max_per_tick=INFERENCES_PER_TICK,
+                         tracker_factory=lambda: IrisGazeTracker(tuning=TUNING),
+                         backend_factory=None if SAMPLE_MODE else lambda: create_backend(LANDMARK_BACKEND))
 
 # initialize core components
-break_manager = BreakManager(SCREEN_TIME_LIMIT, BREAK_DURATION)
-iris_tracker = IrisGazeTracker()
+break_manager = BreakManager(SCREEN_TIME_LIMIT, BREAK_DURATION, programs=REMINDER_PROGRAMS)
+iris_tracker = cameras.primary.tracker
 ui = UIOverlay()
 session_tracker = SessionTracker()
+heatmaps = HeatmapRenderer(session_tracker)
+HEATMAP_VIEWS = ["week", "month", "year", "screen"]
+
+# per-camera screen calibration (G key) and the on-screen gaze density it feeds
+for stream in cameras.streams:
+    calibration = GazeCalibration(f"gaze_calibration_{stream.index}.json")
+    if calibration.load():
+        stream.tracker.calibration = calibration
+        print(f"Loaded gaze calibration for camera {stream.index}")
+gaze_heatmap = GazeHeatmap()
+gaze_heatmap.load()
+GAZE_HEATMAP_SAVE_INTERVAL = 5 * 60
+
+# presence detection - skip FaceMesh and throttle cameras while the user is away
+presence = PresenceDetector(absent_after=3.0, check_interval=0.5, probe_interval=5.0,
+                            on_away_end=session_tracker.record_away)
+
+# optional metrics endpoint
+metrics_server = None
+if METRICS_PORT:
+    metrics_server = MetricsServer(METRICS_PORT)
+    if not metrics_server.start():
+        metrics_server = None
 
 # system tray setup
 running = True
@@ -50,57 +107,229 @@ if TRAY_AVAILABLE:
     print("Press M to minimize to system tray")
 
 print("LookAlive Started")
-print("Controls: Q-Quit | C-Compact | D-Debug | H-Heatmap | P-Reset Position | T-Demo Notifications | M-Minimize")
+print("Controls: Q-Quit | C-Compact | D-Debug | H-Heatmap | G-Calibrate Gaze | P-Reset Position | T-Demo Notifications | M-Minimize")
 
 show_debug = False
+paused = False
+heatmap_view = -1
 last_health_warning = 0
 last_too_close_warning = 0
+calibration_routine = None
+calibration_stream = None
+last_gaze_sample = None
+last_gaze_heatmap_save = time.time()
+
+def start_calibration():
+    global calibration_routine, calibration_stream
+    calibration_stream = display_stream
+    cv2.namedWindow("LookAlive Calibration", cv2.WINDOW_NORMAL)
+    cv2.setWindowProperty("LookAlive Calibration", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+    cv2.waitKey(1)
+    _, _, width, height = cv2.getWindowImageRect("LookAlive Calibration")
+    canvas_size = (width, height) if width > 0 and height > 0 else (1280, 720)
+    calibration = GazeCalibration(f"gaze_calibration_{calibration_stream.index}.json")
+    calibration_routine = CalibrationRoutine(calibration, canvas_size=canvas_size)
+    calibration_routine.start(time.time())
+    print(f"Calibrating camera {calibration_stream.index} - follow the dot with your eyes")
+
+def handle_key(key):
+    global running, show_debug, window_visible, heatmap_view
+    if key == ord("q"):
+        running = False
+    elif key == ord("c"):
+        mode = ui.toggle_compact()
+        print(f"{'Compact' if mode else 'Full'} mode")
+    elif key == ord("d"):
+        show_debug = not show_debug
+        print(f"Debug: {'ON' if show_debug else 'OFF'}")
+    elif key == ord("r"):
+        for stream in cameras.streams:
+            stream.tracker.reset_blink_counter()
+        print("Blink counter reset")
+    elif key == ord("h"):
+        # each press cycles week -> month -> year -> screen (on-screen gaze map)
+        print(session_tracker.generate_heatmap_ascii())
+        heatmap_view = (heatmap_view + 1) % len(HEATMAP_VIEWS)
+        view = HEATMAP_VIEWS[heatmap_view]
+        if view == "screen":
+            image = gaze_heatmap.render(time.time())
+            cv2.imwrite("heatmap_screen.png", image)
+            path = "heatmap_screen.png"
+            if not any(stream.tracker.calibration for stream in cameras.streams):
+                print("No gaze calibration yet - press G to calibrate")
+        else:
+            image = heatmaps.render(view)
+            path = heatmaps.save(view)
+        cv2.imshow("LookAlive Heatmap", image)
+        print(f"Heatmap ({view}) saved to {path}")
+    elif key == ord("g") and not SAMPLE_MODE:
+        start_calibration()
+    elif key == ord("p"):
+        for stream in cameras.streams:
+            stream.tracker.reset_distance_calibration()
+        print("Distance calibration reset - sit at normal position")
+    elif key == ord("t"):
+        print("\nPausing tracking for demo...")
+        demo_notifications()
+        print("Demo complete - resuming tracking\n")
+    elif key == ord("m") and TRAY_AVAILABLE:
+        window_visible = False
+        cv2.destroyAllWindows()
+        tray.minimize()
+        print("Minimized to system tray")
+
+COMMAND_KEYS = {
+    "reset_calibration": "p",
+    "reset_blinks": "r",
+    "toggle_compact": "c",
+    "toggle_debug": "d",
+}
+
+def print_summary():
+    print(session_tracker.generate_heatmap_ascii())
+    print(f"Blinks: {iris_tracker.blink_counter} ({iris_tracker.get_blink_rate():.1f}/min)")
+
+def handle_command(command):
+    global paused
+    if command == "show":
+        if tray.is_minimized:
+            tray.restore()
+        on_tray_show()
+        print("Window restored by another launch")
+    elif command == "summary":
+        print_summary()
+    elif command == "pause":
+        paused = True
+        print("Tracking paused")
+    elif command == "resume":
+        paused = False
+        print("Tracking resumed")
+    else:
+        handle_key(ord(COMMAND_KEYS[command]))
+
+def handle_break_event(event):
+    if event == "start_break":
+        program = break_manager.break_program
+        notify_start_break(program.title, program.message)
+    elif event == "end_break":
+        notify_end_break()
+
+if SAMPLE_MODE:
+    # no window or live stream - the frame loop below is skipped
+    print("Sampling mode - camera opens briefly for each check")
+    monitor = DutyCycleMonitor(cameras.primary.index, iris_tracker, break_manager, session_tracker,
+                               on_break_event=handle_break_event)
+    def keep_sampling():
+        for command in instance.pending_commands():
+            if command == "summary":
+                print_summary()
+        return running
+    monitor.run(keep_sampling)
+    running = False
+else:
+    cameras.start()
+    # create window
+    cv2.namedWindow("LookAlive", cv2.WINDOW_NORMAL)
+
+display_stream = cameras.primary
+analysed = {}  # stream -> frame analysed this tick, reused every tick
+# published to the metrics server, refilled every tick; face-only fields are None without a face
+metrics_status = dict.fromkeys(("gaze", "face_present", "away", "paused", "break_in_progress", "camera",
+                                "blink_rate", "too_close", "time_to_break", "distance_cm"))
 
-# create window
-cv2.namedWindow("LookAlive", cv2.WINDOW_NORMAL)
+loop_metrics = metrics_server.metrics if metrics_server else None
 
 while running:
-    ret, frame = cap.read()
-    if not ret:
+    if metrics_server:
+        for command in metrics_server.pending_commands():
+            handle_command(command)
+    for command in instance.pending_commands():
+        handle_command(command)
+    
+    stage_start = time.perf_counter()
+    batch = cameras.next_batch()
+    if batch is None:
         break
+    if loop_metrics:
+        # capture = the wait for frames, once per tick; later stages start from here
+        t = time.perf_counter()
+        loop_metrics.record("capture", t - stage_start)
+        stage_start = t
     
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = face_mesh.process(rgb)
     now = time.time()
+    analysed.clear()
+    for stream, stream_frame in batch:
+        if paused or not presence.should_analyse(stream.index, stream_frame, now):
+            continue
+        if loop_metrics:
+            stage_start = time.perf_counter()
+        stream.backend.submit(stream.to_rgb(stream_frame), int(now * 1000))
+        result = stream.backend.poll()
+        if loop_metrics:
+            t = time.perf_counter()
+            loop_metrics.record("inference", t - stage_start)
+            stage_start = t
+        if result is None:
+            pass  # async backend still working - keep the previous result
+        elif result.landmarks:
+            analysis = stream.tracker.get_gaze_analysis(result.landmarks, stream_frame.shape, result.blendshapes)
+            cameras.report(stream, analysis)
+        else:
+            cameras.report(stream, None)
+        if loop_metrics:
+            t = time.perf_counter()
+            loop_metrics.record("analysis", t - stage_start)
+            stage_start = t
+        analysed[stream] = stream_frame
     
-    if results.multi_face_landmarks:
-        landmarks = results.multi_face_landmarks[0].landmark
-        
-        # get analysis from iris tracker
-        analysis = iris_tracker.get_gaze_analysis(landmarks, frame.shape)
-        gaze = analysis["gaze_direction"]
-        too_close = analysis["too_close"]
-        blink_rate = analysis["blink_rate"]
+    # fuse all cameras into one "looking at any screen" signal
+    gaze, active_stream = cameras.fused_gaze(now)
+    face_found = active_stream is not None and not paused
+    
+    presence_event = None if paused else presence.update(face_found, now)
+    if presence_event == "away":
+        cameras.set_idle(presence.check_interval)
+        print("User away - tracking paused")
+    elif presence_event == "back":
+        cameras.set_idle(0)
+        print("Welcome back")
+    
+    # show whichever camera currently sees the user
+    if face_found:
+        display_stream = active_stream
+    frame = analysed.get(display_stream)
+    if frame is None:
+        for stream, stream_frame in batch:
+            if stream is display_stream:
+                frame = stream_frame
+    if frame is None and not presence.away:
+        # display camera wasn't read this tick - show its newest raw frame
+        frame = display_stream.peek_frame()
+    if frame is None:
+        handle_key(cv2.waitKey(1) & 0xFF)
+        continue
+    
+    if face_found:
+        analysis = active_stream.analysis
+        too_close = analysis.too_close
+        blink_rate = analysis.blink_rate
         
         # update session tracker
-        session_tracker.update(gaze == "center")
+        session_tracker.update(gaze == "center", now)
         
-        # handle break notifications
-        notify_event, now = break_manager.update_state(gaze)
+        # on-screen gaze density, weighted by time since the last sample
+        if analysis.screen_point is not None and active_stream in analysed:
+            if last_gaze_sample is not None and now - last_gaze_sample <= session_tracker.max_gap:
+                gaze_heatmap.add(*analysis.screen_point, now, weight=now - last_gaze_sample)
+            last_gaze_sample = now
         
-        if notify_event == "start_break":
-            notify_start_break()
-        elif notify_event == "end_break":
-            notify_end_break()
-        
-        # calculate timing info
-        if break_manager.break_in_progress:
-            time_to_break = 0
-            break_remaining = BREAK_DURATION - (now - break_manager.break_start_time)
-        else:
-            if break_manager.start_screen_watch_time:
-                elapsed = now - break_manager.start_screen_watch_time
-                time_to_break = max(0, SCREEN_TIME_LIMIT - elapsed)
-            else:
-                time_to_break = SCREEN_TIME_LIMIT
-            break_remaining = 0
+        # handle break notifications
+        handle_break_event(break_manager.update_state(gaze, now)[0])
         
-        screen_time_mins = int((now - (break_manager.start_screen_watch_time or now)) / 60)
+        # timing info straight from the scheduler
+        time_to_break = break_manager.time_to_break(now)
+        break_remaining = break_manager.break_remaining(now)
+        screen_time_mins = int(break_manager.screen_time(now) / 60)
         
         # draw ui overlay
         frame = ui.draw_status_bar(
@@ -111,7 +340,8 @@ while running:
             break_remaining=break_remaining,
             blink_rate=blink_rate,
             too_close=too_close,
-            screen_time_mins=screen_time_mins
+            screen_time_mins=screen_time_mins,
+            break_length=break_manager.break_program.duration if break_manager.break_in_progress else BREAK_DURATION,
         )
         
         # too close warning
@@ -127,65 +357,84 @@ while running:
         
         # debug overlay
         if show_debug:
-            if analysis['iris_positions']:
-                left_x, left_y, right_x, right_y = analysis['iris_positions']
+            if analysis.iris_positions is not None:
+                left_x, left_y, right_x, right_y = analysis.iris_positions
                 cv2.circle(frame, (int(left_x), int(left_y)), 3, (0, 255, 0), -1)
                 cv2.circle(frame, (int(right_x), int(right_y)), 3, (0, 255, 0), -1)
     
     else:
-        # no face detected
-        break_manager.reset()
-        h, w = frame.shape[:2]
-        ui.draw_rounded_rect(frame, w//2 - 150, h//2 - 30, 300, 60, (0, 0, 150), 0.8)
-        cv2.putText(frame, "No Face Detected", (w//2 - 100, h//2 + 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        # no face detected - counts as looking away (grace periods apply)
+        handle_break_event(break_manager.update_state("away", now)[0])
+        if paused:
+            message = "Paused"
+        elif presence.away:
+            message = "Away"
+        else:
+            message = "No Face Detected"
+        ui.draw_no_face(frame, message)
+    
+    if calibration_routine:
+        features = None
+        if calibration_stream in analysed and calibration_stream.analysis is not None:
+            features = calibration_stream.analysis.gaze_features
+        outcome = calibration_routine.update(features, now)
+        if outcome:
+            cv2.destroyWindow("LookAlive Calibration")
+            calibration = calibration_routine.calibration
+            if outcome == "done":
+                calibration_stream.tracker.calibration = calibration
+                print(f"Gaze calibration saved (error {calibration.rms_error * 100:.0f}% of screen)")
+            else:
+                print("Calibration failed - not enough samples, press G to try again")
+            calibration_routine = None
+        else:
+            cv2.imshow("LookAlive Calibration", calibration_routine.draw(now))
+    
+    if now - last_gaze_heatmap_save > GAZE_HEATMAP_SAVE_INTERVAL:
+        gaze_heatmap.save_in_background()
+        last_gaze_heatmap_save = now
     
     if window_visible:
         cv2.imshow("LookAlive", frame)
     
+    if metrics_server:
+        loop_metrics.record("render", time.perf_counter() - stage_start)
+        loop_metrics.tick(now)
+        metrics_status["gaze"] = gaze
+        metrics_status["face_present"] = face_found
+        metrics_status["away"] = presence.away
+        metrics_status["paused"] = paused
+        metrics_status["break_in_progress"] = break_manager.break_in_progress
+        metrics_status["camera"] = display_stream.index
+        metrics_status["blink_rate"] = round(blink_rate, 2) if face_found else None
+        metrics_status["too_close"] = too_close if face_found else None
+        metrics_status["time_to_break"] = round(time_to_break, 1) if face_found else None
+        metrics_status["distance_cm"] = analysis.distance_cm if face_found else None
+        metrics_server.publish(metrics_status)
+    
     # update tray status
     if TRAY_AVAILABLE and tray.icon:
         if break_manager.break_in_progress:
             tray.update_status("Break Time", "orange")
-        elif results.multi_face_landmarks and too_close:
+        elif face_found and too_close:
             tray.update_status("Too Close!", "red")
         else:
             tray.update_status("Running", "green")
     
-    # handle keyboard input
-    key = cv2.waitKey(1) & 0xFF
-    if key == ord("q"):
-        running = False
-    elif key == ord("c"):
-        mode = ui.toggle_compact()
-        print(f"{'Compact' if mode else 'Full'} mode")
-    elif key == ord("d"):
-        show_debug = not show_debug
-        print(f"Debug: {'ON' if show_debug else 'OFF'}")
-    elif key == ord("r"):
-        iris_tracker.reset_blink_counter()
-        print("Blink counter reset")
-    elif key == ord("h"):
-        print(session_tracker.generate_heatmap_ascii())
-    elif key == ord("p"):
-        iris_tracker.reset_distance_calibration()
-        print("Distance calibration reset - sit at normal position")
-    elif key == ord("t"):
-        print("\nPausing tracking for demo...")
-        demo_notifications()
-        print("Demo complete - resuming tracking\n")
-    elif key == ord("m") and TRAY_AVAILABLE:
-        window_visible = False
-        cv2.destroyAllWindows()
-        tray.minimize()
-        print("Minimized to system tray")
+    handle_key(cv2.waitKey(1) & 0xFF)
 
 # cleanup
+instance.release()
 tray.stop()
-cap.release()
+if metrics_server:
+    metrics_server.stop()
+cameras.release()
 cv2.destroyAllWindows()
 
 # end session and show summary
+presence.finish()
+gaze_heatmap.close()
+gaze_heatmap.save()
 session_tracker.end_session()
 print(f"\nTotal blinks: {iris_tracker.blink_counter}")
 print(f"Average blink rate: {iris_tracker.get_blink_rate():.1f}/min")
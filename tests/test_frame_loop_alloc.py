@@ -0,0 +1,169 @@
+"""
+Frame loop allocation test - after warm-up, the per-frame path (capture
+hand-off, RGB conversion, gaze analysis, fusion, overlay) must not grow memory
+"""
+import math
+import tracemalloc
+
+import numpy as np
+
+from core import CaptureManager, GazeCalibration, IrisGazeTracker, UIOverlay
+from core.face_geometry import CANONICAL_FACE, IRIS_RINGS, POSE_LANDMARKS, CircleFitter, fit_circle_radii
+
+FRAME_SHAPE = (480, 640, 3)
+WARMUP_FRAMES = 300
+FRAMES = 600
+
+
+class Landmark:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x=0.5, y=0.5, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+
+class Clock:
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+
+class SyntheticFace:
+    """478 FaceMesh-style landmarks for a face ~50 cm away, swaying and blinking."""
+
+    def __init__(self):
+        h, w = FRAME_SHAPE[:2]
+        self.landmarks = [Landmark() for _ in range(478)]
+
+        # project the canonical face, so the pose solve sees a consistent head
+        depth = 500.0
+        self.base = {}
+        for idx, (x, y, z) in zip(POSE_LANDMARKS, CANONICAL_FACE):
+            self.base[idx] = (0.5 + x / (depth + z), 0.5 + y * w / h / (depth + z))
+        (lx, ly), (rx, ry) = self.base[33], self.base[263]
+        self.base[133] = (lx + 0.045, ly)
+        self.base[362] = (rx - 0.045, ry)
+        for top, bottom, (cx, cy) in ((159, 145, (lx + 0.0225, ly)), (386, 374, (rx - 0.0225, ry))):
+            self.base[top] = (cx, cy - 0.01)
+            self.base[bottom] = (cx, cy + 0.01)
+        for center, ring, (cx, cy) in ((468, IRIS_RINGS[0], (lx + 0.0225, ly)),
+                                       (473, IRIS_RINGS[1], (rx - 0.0225, ry))):
+            self.base[center] = (cx, cy)
+            for i, idx in enumerate(ring):
+                angle = i * math.pi / 2
+                self.base[idx] = (cx + 0.009 * math.cos(angle), cy + 0.012 * math.sin(angle))
+
+    def update(self, frame_index):
+        sway = 0.01 * math.sin(frame_index * 0.05)
+        closed = frame_index % 90 < 5
+        for idx, (x, y) in self.base.items():
+            lm = self.landmarks[idx]
+            lm.x = x + sway
+            lm.y = y
+        if closed:
+            for top, bottom in ((159, 145), (386, 374)):
+                self.landmarks[top].y = self.landmarks[bottom].y = self.base[top][1] + 0.01
+        return self.landmarks
+
+
+class FrameLoop:
+    """One camera driven the way main.py drives it, without a device behind it."""
+
+    def __init__(self):
+        self.clock = Clock()
+        self.cameras = CaptureManager([0], tracker_factory=lambda: IrisGazeTracker(clock=self.clock))
+        self.stream = self.cameras.primary
+        self.tracker = self.stream.tracker
+        self.ui = UIOverlay()
+        self.face = SyntheticFace()
+        self.frame_index = 0
+
+        rng = np.random.default_rng(0)
+        targets = [(x, y) for y in (0.1, 0.5, 0.9) for x in (0.1, 0.5, 0.9)] * 4
+        features = rng.normal(0, 0.1, (len(targets), 4)) + np.array(targets).repeat(2, axis=1)
+        self.tracker.calibration = GazeCalibration(path=None)
+        assert self.tracker.calibration.fit(features, targets)
+
+        self.source = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+        self.source[:, :, 1] = 90
+
+    def deliver(self):
+        # what the reader thread does after decoding into a free ring slot
+        stream = self.stream
+        with stream.lock:
+            slot = 0
+            while slot == stream.latest_slot or slot == stream.held_slot:
+                slot += 1
+            if stream.buffers[slot] is None:
+                stream.buffers[slot] = self.source.copy()
+            else:
+                np.copyto(stream.buffers[slot], self.source)
+            stream.latest_slot = slot
+            stream.frame_seq += 1
+
+    def step(self):
+        self.clock.t += 1 / 30
+        now = self.clock.t
+        self.deliver()
+        landmarks = self.face.update(self.frame_index)
+        self.frame_index += 1
+
+        for stream, frame in self.cameras.next_batch(timeout=0):
+            stream.to_rgb(frame)
+            analysis = stream.tracker.get_gaze_analysis(landmarks, frame.shape)
+            self.cameras.report(stream, analysis, now)
+        gaze, active = self.cameras.fused_gaze(now)
+        analysis = active.analysis
+        self.ui.draw_status_bar(frame, gaze, False, 600.0, 0, analysis.blink_rate,
+                                analysis.too_close, 42)
+        return analysis
+
+    def run(self, frames):
+        for _ in range(frames):
+            self.step()
+
+
+def test_synthetic_face_is_tracked():
+    loop = FrameLoop()
+    loop.run(WARMUP_FRAMES)
+    analysis = loop.step()
+    assert analysis.gaze_direction == "center"
+    assert analysis.screen_point is not None
+    assert 30 < analysis.distance_cm < 100
+    assert loop.tracker.blink_counter > 0
+
+
+def test_frame_loop_does_not_allocate_per_frame():
+    loop = FrameLoop()
+    loop.run(WARMUP_FRAMES)
+
+    tracemalloc.start()
+    try:
+        loop.run(10)  # let tracemalloc's own bookkeeping settle
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        loop.run(FRAMES)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    growth_per_frame = (current - start) / FRAMES
+    assert growth_per_frame < 8, f"frame loop grows {growth_per_frame:.1f} bytes per frame"
+    # a single frame-sized temporary (640x480x3 = 900 KB) would show up here
+    assert peak - start < 16 * 1024, f"peak transient allocation {peak - start} bytes"
+
+
+def test_circle_fitter_matches_batched_fit():
+    rng = np.random.default_rng(1)
+    angles = rng.uniform(0, 2 * math.pi, (50, 4))
+    radii = rng.uniform(3, 30, (50, 1))
+    centers = rng.uniform(0, 640, (50, 1, 2))
+    points = centers + radii[..., None] * np.stack([np.cos(angles), np.sin(angles)], axis=-1)
+
+    np.testing.assert_allclose(fit_circle_radii(points), radii[:, 0], rtol=1e-6)
+    fitter = CircleFitter(50, 4)
+    first = fitter.fit(points)
+    assert fitter.fit(points) is first  # reused output buffer
+    np.testing.assert_allclose(first, radii[:, 0], rtol=1e-6)
@@ -1,8 +1,177 @@
+import json
+import os
+import sys
+import time
+
 import cv2
 
-def get_webcam_capture():
-    # try to use CAP_DSHOW on Windows, fallback for others [CHANGE THIS IF YOU'RE NOT ON WINDOWS!]
-    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW if hasattr(cv2, 'CAP_DSHOW') else 0)
+PROFILE_CACHE = "capture_profiles.json"
+
+# candidate capture profiles, benchmarked once per device
+CANDIDATE_PROFILES = [
+    {"width": 640, "height": 480, "fps": 30, "fourcc": "MJPG"},
+    {"width": 640, "height": 480, "fps": 30, "fourcc": "YUYV"},
+    {"width": 1280, "height": 720, "fps": 30, "fourcc": "MJPG"},
+    {"width": 1280, "height": 720, "fps": 30, "fourcc": "YUYV"},
+]
+
+# the same pixel format goes by different names per capture api
+FOURCC_ALIASES = {"YUYV": ("YUYV", "YUY2"), "YUY2": ("YUY2", "YUYV")}
+
+_profile_memo = {}
+
+
+def default_backend():
+    # pick the native capture api for this platform
+    if sys.platform.startswith("win"):
+        return getattr(cv2, "CAP_DSHOW", cv2.CAP_ANY)
+    if sys.platform.startswith("linux"):
+        return getattr(cv2, "CAP_V4L2", cv2.CAP_ANY)
+    if sys.platform == "darwin":
+        return getattr(cv2, "CAP_AVFOUNDATION", cv2.CAP_ANY)
+    return cv2.CAP_ANY
+
+
+def _fourcc_to_str(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+
+
+def _backend_fourcc(cap, fourcc):
+    # DirectShow only knows packed YUV 4:2:2 as YUY2
+    if fourcc == "YUYV" and cap.getBackendName() == "DSHOW":
+        return "YUY2"
+    return fourcc
+
+
+def fourcc_matches(requested, reported) -> bool:
+    return reported in FOURCC_ALIASES.get(requested, (requested,))
+
+
+def apply_profile(cap, profile):
+    # fourcc first - some drivers only expose sizes per pixel format
+    if profile.get("fourcc"):
+        fourcc = _backend_fourcc(cap, profile["fourcc"])
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    if profile.get("width"):
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile["width"])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile["height"])
+    if profile.get("fps"):
+        cap.set(cv2.CAP_PROP_FPS, profile["fps"])
+    # keep the driver queue short so we always get a fresh frame
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, profile.get("buffer_size", 1))
+
+
+def benchmark_profile(index, backend, profile, frames=20, warmup=5):
+    """
+    time one profile's decode + colour conversion, separately from the wait
+    for the sensor (which is ~1/fps for every profile and says nothing about cost)
+    returns: result dict, or None if the camera rejected the profile
+    """
+    cap = cv2.VideoCapture(index, backend)
+    if not cap.isOpened():
+        return None
+    try:
+        apply_profile(cap, profile)
+        for _ in range(warmup):
+            cap.read()
+
+        cost = 0.0
+        wait = 0.0
+        shape = None
+        frame = rgb = None
+        start = time.perf_counter()
+        for _ in range(frames):
+            t = time.perf_counter()
+            if not cap.grab():
+                return None
+            t2 = time.perf_counter()
+            ret, frame = cap.retrieve(frame)
+            if not ret:
+                return None
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            cost += time.perf_counter() - t2
+            wait += t2 - t
+            shape = frame.shape
+        elapsed = time.perf_counter() - start
+
+        return {
+            "profile": profile,
+            "cost_ms": cost / frames * 1000,
+            "wait_ms": wait / frames * 1000,
+            "fps": frames / elapsed if elapsed > 0 else 0,
+            "width": shape[1],
+            "height": shape[0],
+            "fourcc": _fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+        }
+    finally:
+        cap.release()
+
+
+def _load_cache(cache_file):
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r') as f:
+                return json.load(f)
+        except:
+            pass
+    return {}
+
+
+def select_profile(index, backend, cache_file=PROFILE_CACHE):
+    """
+    cached fastest profile for this device, benchmarking candidates on first use
+    returns: profile dict, or None to keep driver defaults
+    """
+    # v2: entries ranked on decode cost and checked for the delivered fourcc
+    key = f"v2:{sys.platform}:{backend}:{index}"
+    if key in _profile_memo:
+        return _profile_memo[key]
+
+    cache = _load_cache(cache_file)
+    if key in cache:
+        _profile_memo[key] = cache[key]["profile"]
+        return _profile_memo[key]
+
+    print(f"Benchmarking capture profiles for camera {index}...")
+    best = None
+    results = []
+    for profile in CANDIDATE_PROFILES:
+        result = benchmark_profile(index, backend, profile)
+        if result is None:
+            continue
+        results.append(result)
+        # the driver may silently fall back to another size, format or rate
+        delivered = (result["width"] == profile["width"] and result["height"] == profile["height"]
+                     and fourcc_matches(profile["fourcc"], result["fourcc"]))
+        fast_enough = result["fps"] >= profile["fps"] * 0.8
+        print(f"  {profile['width']}x{profile['height']} {profile['fourcc']} (got {result['fourcc']}): "
+              f"{result['cost_ms']:.1f}ms decode+convert, {result['fps']:.0f}fps")
+        if delivered and fast_enough and (best is None or result["cost_ms"] < best["cost_ms"]):
+            best = result
+
+    profile = best["profile"] if best else None
+    _profile_memo[key] = profile
+    if results:
+        # when nothing passed, remember that too, so later launches go straight to driver defaults
+        cache[key] = best or {"profile": None, "results": results}
+        try:
+            with open(cache_file, 'w') as f:
+                json.dump(cache, f, indent=2)
+        except Exception as e:
+            print(f"Error saving capture profile: {e}")
+    return profile
+
+
+def get_webcam_capture(index=0, profile="auto", backend=None):
+    # profile: "auto" (cached benchmark), a profile dict, or None for driver defaults
+    backend = default_backend() if backend is None else backend
+    if profile == "auto":
+        profile = select_profile(index, backend)
+
+    cap = cv2.VideoCapture(index, backend)
     if not cap.isOpened():
-        raise RuntimeError("Cannot open webcam")
-    return cap
\ No newline at end of file
+        raise RuntimeError(f"Cannot open webcam {index}")
+    if profile:
+        apply_profile(cap, profile)
+    return cap